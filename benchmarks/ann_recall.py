@@ -0,0 +1,107 @@
+"""Recall@k versus latency of the local IVF index against exact search.
+
+Usage (from the repository root):
+
+    python -m benchmarks.ann_recall --rows 100000 --dim 768 --probes 1 4 8 16
+    python -m benchmarks.ann_recall --store /path/to/local_vector_store
+
+Without `--store` a synthetic clustered corpus is generated; queries are
+noisy copies of random rows. Recall@k is the share of the exact top-k that
+the index also returns.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.app.core.retrieval.ivf import IVFIndex
+from src.app.core.retrieval.matrix import DenseMatrix, top_k_indices
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def synthetic_corpus(rows: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(clusters, size=rows)
+    noise = rng.normal(scale=0.6, size=(rows, dim)).astype(np.float32)
+    return _normalize(centers[labels] + noise)
+
+
+def load_store(path: Path) -> np.ndarray:
+    return _normalize(np.load(path / "vectors.npy").astype(np.float32))
+
+
+def _percentile_ms(latencies: list[float], q: float) -> float:
+    return float(np.percentile(latencies, q) * 1000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--store", type=Path, help="local vector store directory")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=None)
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.store:
+        vectors = load_store(args.store)
+    else:
+        vectors = synthetic_corpus(args.rows, args.dim, args.clusters, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    picks = rng.integers(len(vectors), size=args.queries)
+    noise = rng.normal(scale=0.05, size=(args.queries, vectors.shape[1]))
+    queries = _normalize(vectors[picks] + noise.astype(np.float32))
+
+    matrix = DenseMatrix()
+    matrix.append(vectors)
+
+    started = time.perf_counter()
+    index = IVFIndex(n_lists=args.lists, min_rows=0)
+    index.train(matrix.vectors)
+    print(
+        f"rows={len(vectors)} dim={vectors.shape[1]} lists={len(index.centroids)} "
+        f"train={time.perf_counter() - started:.2f}s k={args.k}"
+    )
+
+    truth, exact_latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        truth.append(set(top_k_indices(matrix.scores(query), args.k).tolist()))
+        exact_latencies.append(time.perf_counter() - started)
+    print(
+        f"{'exact':>10}  recall@{args.k}=1.000  "
+        f"p50={_percentile_ms(exact_latencies, 50):.2f}ms  "
+        f"p95={_percentile_ms(exact_latencies, 95):.2f}ms"
+    )
+
+    for n_probe in args.probes:
+        hits, latencies, scanned = 0, [], 0
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            rows = index.probe(query, n_probe)
+            best = top_k_indices(matrix.scores(query, rows), args.k)
+            found = rows[best]
+            latencies.append(time.perf_counter() - started)
+            hits += len(expected.intersection(found.tolist()))
+            scanned += len(rows)
+        print(
+            f"{f'probe={n_probe}':>10}  "
+            f"recall@{args.k}={hits / (args.k * len(queries)):.3f}  "
+            f"p50={_percentile_ms(latencies, 50):.2f}ms  "
+            f"p95={_percentile_ms(latencies, 95):.2f}ms  "
+            f"scanned={scanned / len(queries) / len(vectors):.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Per-query latency and QPS of each Pinecone transport against a stand-in server.
+
+Usage (from the repository root):
+
+    python -m benchmarks.pinecone_transport --queries 500 --concurrency 16
+
+A FastAPI app emulating Pinecone's REST data plane (`/query`,
+`/vectors/upsert`) is served by uvicorn in a separate process on localhost,
+with an optional simulated server latency, so only client-side transport
+overhead differs between runs. The "asyncio-per-call" row is langchain's
+stock `PineconeVectorStore`, which opens a new client for every async query
+(concurrent queries can hit a client another query already closed; those
+show up as errors).
+
+The gRPC transport cannot be exercised here: it needs a server speaking
+Pinecone's gRPC protocol, so run it against a real index (set
+PINECONE_API_KEY / --host) to compare.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import socket
+import time
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from langchain_core.embeddings import FakeEmbeddings
+from langchain_pinecone import PineconeVectorStore
+
+from src.app.core.retrieval.pinecone_store import (
+    PooledPineconeVectorStore,
+    create_pinecone_index,
+)
+
+API_KEY = "benchmark"
+
+
+def stand_in_app(latency_seconds: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/query")
+    async def query(request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency_seconds)
+        matches = [
+            {
+                "id": f"doc-{i}",
+                "score": 1.0 - i / 100,
+                "values": [],
+                "metadata": {"text": f"chunk {i}", "page": i},
+            }
+            for i in range(body.get("topK", 4))
+        ]
+        return {"matches": matches, "namespace": body.get("namespace", "")}
+
+    @app.post("/vectors/upsert")
+    async def upsert(request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency_seconds)
+        return {"upsertedCount": len(body.get("vectors", []))}
+
+    return app
+
+
+def _run_server(latency_seconds: float, port: int) -> None:
+    uvicorn.run(
+        stand_in_app(latency_seconds), host="127.0.0.1", port=port, log_level="error"
+    )
+
+
+def serve(latency_seconds: float) -> str:
+    """Start the stand-in server in a daemon process and return its host URL."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    multiprocessing.Process(
+        target=_run_server, args=(latency_seconds, port), daemon=True
+    ).start()
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return f"http://localhost:{port}"
+
+
+async def run(
+    store, vectors, concurrency: int, k: int
+) -> tuple[list[float], int, float]:
+    """Query every vector, `concurrency` at a time: (latencies, errors, elapsed)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(vector):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await store.asimilarity_search_by_vector_with_score(vector, k=k)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(vector) for vector in vectors))
+    return latencies, errors, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", help="index host (default: local stand-in server)")
+    parser.add_argument("--server-latency-ms", type=float, default=2.0)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--pool-threads", type=int, default=8)
+    parser.add_argument("--pool-maxsize", type=int, default=32)
+    parser.add_argument(
+        "--transports",
+        nargs="+",
+        default=["http", "asyncio", "asyncio-per-call"],
+        choices=["http", "grpc", "asyncio", "asyncio-per-call"],
+    )
+    args = parser.parse_args()
+    print(f"queries={args.queries} concurrency={args.concurrency} k={args.k}")
+
+    host = args.host or serve(args.server_latency_ms / 1000)
+    embedding = FakeEmbeddings(size=args.dim)
+    rng = random.Random(0)
+    vectors = [[rng.random() for _ in range(args.dim)] for _ in range(args.queries)]
+
+    for transport in args.transports:
+        pooled = transport != "asyncio-per-call"
+        index = create_pinecone_index(
+            API_KEY,
+            transport="asyncio" if not pooled else transport,
+            host=host,
+            pool_threads=args.pool_threads,
+            connection_pool_maxsize=args.pool_maxsize,
+        )
+        if pooled:
+            store = PooledPineconeVectorStore(
+                index, embedding, transport, API_KEY, args.pool_maxsize
+            )
+        else:
+            store = PineconeVectorStore(index=index, embedding=embedding)
+
+        async def bench():
+            # Warm up connections, then measure
+            await run(store, vectors[: args.concurrency], args.concurrency, args.k)
+            result = await run(store, vectors, args.concurrency, args.k)
+            if pooled:
+                await store.aclose()
+            return result
+
+        latencies, errors, elapsed = asyncio.run(bench())
+        ms = np.array(latencies or [float("nan")]) * 1000
+        print(
+            f"{transport:>17}  p50={np.percentile(ms, 50):6.2f}ms  "
+            f"p95={np.percentile(ms, 95):6.2f}ms  "
+            f"qps={len(latencies) / elapsed:7.1f}  errors={errors}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
+import asyncio
+import json
 from pathlib import Path
+from typing import Any, Dict
 
 from fastapi import FastAPI, File, HTTPException, Request, UploadFile, status
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from .core.llm.tokens import start_warm_up
+from .core.metrics import get_metrics_snapshot
+from .core.retrieval.pinecone_store import set_main_loop
 from .models import QuestionRequest, QAResponse
-from .services.qa_service import answer_question
+from .services.qa_service import answer_question, stream_answer
 from .services.indexing_service import index_pdf_file
 
 
@@ -29,6 +36,23 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def warm_up_tokenizer() -> None:
+    # tiktoken downloads its BPE files on first use; load them off the event loop
+    start_warm_up()
+
+
+@app.on_event("startup")
+async def bind_main_loop() -> None:
+    # Async work started from indexing worker threads runs on this loop
+    set_main_loop(asyncio.get_running_loop())
+
+
+@app.on_event("shutdown")
+async def unbind_main_loop() -> None:
+    set_main_loop(None)
+
+
 from fastapi import APIRouter
 
 api_router = APIRouter(prefix="/api")
@@ -41,20 +65,75 @@ async def api_root():
 async def health():
     return {"status": "healthy", "version": "0.1.0"}
 
-@api_router.post("/qa", response_model=QAResponse, status_code=status.HTTP_200_OK)
-async def qa_endpoint(payload: QuestionRequest) -> QAResponse:
+@api_router.get("/metrics")
+async def metrics():
+    return get_metrics_snapshot()
+
+def _validate_question(payload: QuestionRequest) -> str:
     question = payload.question.strip()
     if not question:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="`question` must be a non-empty string.",
         )
-    result = answer_question(question)
+    return question
+
+def _build_qa_response(result: Dict[str, Any]) -> QAResponse:
     return QAResponse(
-        answer=result.get("answer", ""),
-        context=result.get("context", ""),
+        answer=result.get("answer") or "",
+        context=result.get("context") or "",
         plan=result.get("plan"),
         sub_questions=result.get("sub_questions"),
+        retrieval_mode=result.get("retrieval_mode"),
+        cached=bool(result.get("cached")),
+        verified=result.get("verified"),
+        token_usage=result.get("token_usage"),
+        partial=bool(result.get("partial")),
+        degradations=result.get("degradations") or [],
+        reason=result.get("reason") or "answered",
+    )
+
+def _format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@api_router.post("/qa", response_model=QAResponse, status_code=status.HTTP_200_OK)
+async def qa_endpoint(payload: QuestionRequest) -> QAResponse:
+    question = _validate_question(payload)
+    result = await answer_question(
+        question,
+        retrieval_mode=payload.retrieval_mode,
+        planning_mode=payload.planning_mode,
+        timeout_seconds=payload.timeout_seconds,
+    )
+    return _build_qa_response(result)
+
+@api_router.post("/qa/stream", status_code=status.HTTP_200_OK)
+async def qa_stream_endpoint(payload: QuestionRequest) -> StreamingResponse:
+    """Server-Sent Events variant of `/qa`.
+
+    Emits `plan`, `retrieval` and `token` events as the pipeline progresses and
+    finishes with a `done` event carrying the `QAResponse` payload.
+    """
+    question = _validate_question(payload)
+
+    async def event_source():
+        try:
+            async for event, data in stream_answer(
+                question,
+                retrieval_mode=payload.retrieval_mode,
+                planning_mode=payload.planning_mode,
+                timeout_seconds=payload.timeout_seconds,
+            ):
+                if event == "done":
+                    data = _build_qa_response(data).model_dump()
+                yield _format_sse(event, data)
+        except Exception as exc:  # the response has already started; report in-band
+            yield _format_sse("error", {"detail": str(exc)})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 @api_router.post("/index-pdf", status_code=status.HTTP_200_OK)
@@ -70,7 +149,7 @@ async def index_pdf(file: UploadFile = File(...)) -> dict:
     file_path = upload_dir / file.filename
     contents = await file.read()
     file_path.write_bytes(contents)
-    chunks_indexed = index_pdf_file(file_path)
+    chunks_indexed = await run_in_threadpool(index_pdf_file, file_path)
     return {
         "filename": file.filename,
         "chunks_indexed": chunks_indexed,
@@ -4,22 +4,48 @@ This module defines four LangChain agents (Planning, Retrieval, Summarization,
 Verification) and thin node functions that LangGraph uses to invoke them.
 """
 
-from typing import List
+import asyncio
+import time
+from typing import List, Tuple
 
 from langchain.agents import create_agent
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
-
-from ..llm.factory import create_chat_model
+from langchain_core.runnables.config import var_child_runnable_config
+from langgraph.config import get_stream_writer
+
+from langchain_core.documents import Document
+
+from ..config import get_settings
+from ..hedging import hedged
+from ..llm.factory import create_chat_model, get_agent_model_name
+from ..llm.tokens import count_tokens
+from ..metrics import average_latency, increment, observe_latency
+from ..retrieval.context import deduplicate_chunks
+from ..retrieval.serialization import serialize_chunks
+from ..retrieval.vector_store import aretrieve_context, start_retrieve_many
 from .prompts import (
     PLANNING_SYSTEM_PROMPT,
     RETRIEVAL_SYSTEM_PROMPT,
     SUMMARIZATION_SYSTEM_PROMPT,
     VERIFICATION_SYSTEM_PROMPT,
 )
+from .deadline import (
+    DEADLINE_ANSWER,
+    degraded,
+    stage_budget,
+    time_left,
+    within,
+)
+from .grounding import groundedness_score
+from .routing import query_similarity
 from .state import QAState
 from .tools import retrieval_tool
 
 
+# Answer returned when retrieval finds nothing relevant to the question
+NOT_FOUND_ANSWER = "The answer to this question was not found in the document."
+
+
 def _extract_last_ai_content(messages: List[object]) -> str:
     """Extract the content of the last AIMessage in a messages list."""
     for msg in reversed(messages):
@@ -28,6 +54,33 @@ def _extract_last_ai_content(messages: List[object]) -> str:
     return ""
 
 
+async def _invoke_detached(agent, payload: dict) -> dict:
+    """Invoke `agent` outside the calling node's runnable context.
+
+    LangChain merges an explicit `callbacks` config with the parent's handlers,
+    so the parent config is cleared instead. This only affects the current task
+    (hedged copies run in their own task with a copied context).
+    """
+    var_child_runnable_config.set(None)
+    return await agent.ainvoke(payload)
+
+
+async def _invoke_agent(agent, name: str, content: str) -> dict:
+    """Invoke an agent with a single user message, hedging slow calls.
+
+    A hedged backup copy runs detached from the node's callbacks, so its tokens
+    are never streamed to clients; if it wins, streaming clients only get the
+    stage's final output.
+    """
+    payload = {"messages": [HumanMessage(content=content)]}
+    return await hedged(
+        f"chat.{name}",
+        lambda is_hedge: (
+            _invoke_detached(agent, payload) if is_hedge else agent.ainvoke(payload)
+        ),
+    )
+
+
 # Internal private getters for lazy initialization
 _planning_agent = None
 _retrieval_agent = None
@@ -38,7 +91,7 @@ def get_planning_agent():
     global _planning_agent
     if _planning_agent is None:
         _planning_agent = create_agent(
-            model=create_chat_model(),
+            model=create_chat_model(agent="planning"),
             tools=[],
             system_prompt=PLANNING_SYSTEM_PROMPT,
         )
@@ -48,7 +101,7 @@ def get_retrieval_agent():
     global _retrieval_agent
     if _retrieval_agent is None:
         _retrieval_agent = create_agent(
-            model=create_chat_model(),
+            model=create_chat_model(agent="retrieval"),
             tools=[retrieval_tool],
             system_prompt=RETRIEVAL_SYSTEM_PROMPT,
         )
@@ -58,7 +111,7 @@ def get_summarization_agent():
     global _summarization_agent
     if _summarization_agent is None:
         _summarization_agent = create_agent(
-            model=create_chat_model(),
+            model=create_chat_model(agent="summarization"),
             tools=[],
             system_prompt=SUMMARIZATION_SYSTEM_PROMPT,
         )
@@ -68,7 +121,7 @@ def get_verification_agent():
     global _verification_agent
     if _verification_agent is None:
         _verification_agent = create_agent(
-            model=create_chat_model(),
+            model=create_chat_model(agent="verification"),
             tools=[],
             system_prompt=VERIFICATION_SYSTEM_PROMPT,
         )
@@ -94,19 +147,47 @@ def _parse_planning_output(content: str):
     return plan, sub_questions
 
 
-def planning_node(state: QAState) -> QAState:
+async def planning_node(state: QAState) -> QAState:
     """Planning Agent node: decomposes question into a search strategy.
 
     This node:
     - Sends the user's question to the Planning Agent.
+    - Meanwhile (when `speculative_retrieval` is enabled) retrieves the raw
+      question, so retrieval is off the critical path for sub-questions that
+      turn out to match it.
     - Extracts the natural language 'plan' and list of 'sub_questions'.
     - Stores them in the state for the Retrieval Agent to use.
+    - If planning exceeds its share of the request deadline, the original
+      question is used as the only sub-question ("planning_skipped").
     """
     question = state["question"]
+    settings = get_settings()
+    budget = stage_budget(state, settings.deadline_planning_fraction)
+
+    async def _plan() -> str | None:
+        agent = get_planning_agent()
+        try:
+            result = await within(
+                _invoke_agent(agent, "planning", question), budget
+            )
+        except TimeoutError:
+            return None
+        return _extract_last_ai_content(result.get("messages", []))
+
+    if settings.speculative_retrieval:
+        content, speculative_documents = await asyncio.gather(
+            _plan(), _speculative_retrieve(question, budget)
+        )
+    else:
+        content, speculative_documents = await _plan(), None
 
-    agent = get_planning_agent()
-    result = agent.invoke({"messages": [HumanMessage(content=question)]})
-    content = _extract_last_ai_content(result.get("messages", []))
+    if content is None:
+        return {
+            "plan": None,
+            "sub_questions": [question],
+            "speculative_documents": speculative_documents,
+            **degraded("planning_skipped"),
+        }
 
     plan, sub_questions = _parse_planning_output(content)
 
@@ -117,77 +198,251 @@ def planning_node(state: QAState) -> QAState:
     return {
         "plan": plan,
         "sub_questions": sub_questions,
+        "speculative_documents": speculative_documents,
     }
 
 
-def retrieval_node(state: QAState) -> QAState:
-    """Retrieval Agent node: gathers context from vector store.
+async def _speculative_retrieve(
+    question: str, budget: float | None
+) -> List[Document] | None:
+    """Retrieve the raw question; failures only cost the speculation."""
+    try:
+        _context, docs = await within(
+            aretrieve_context(question, k=get_settings().retrieval_k, serialize=False),
+            budget,
+        )
+    except Exception:
+        return None
+    return docs
 
-    This node:
-    - Iterates through the sub-questions generated by the Planning Agent.
-    - Sends each sub-question to the Retrieval Agent.
-    - Consolidates all retrieved context from all sub-queries.
-    - Stores the unique context string in `state["context"]`.
+
+def skip_planning_node(state: QAState) -> QAState:
+    """Stand-in for the Planning Agent on simple questions.
+
+    Uses the original question as the only sub-question, without an LLM call.
     """
-    sub_questions = state.get("sub_questions") or [state["question"]]
-    all_contexts = []
+    return {
+        "plan": None,
+        "sub_questions": [state["question"]],
+    }
 
+
+async def _agentic_retrieve(sub_question: str) -> Tuple[str, List[Document]] | None:
+    """Let the Retrieval Agent search for a sub-question via its tool."""
     agent = get_retrieval_agent()
-    for sq in sub_questions:
-        result = agent.invoke({"messages": [HumanMessage(content=sq)]})
-        messages = result.get("messages", [])
+    result = await _invoke_agent(agent, "retrieval", sub_question)
+    messages = result.get("messages", [])
+
+    # Extract context and Document artifact from ToolMessage
+    for msg in reversed(messages):
+        if isinstance(msg, ToolMessage):
+            return str(msg.content), list(msg.artifact or [])
+    return None
 
-        # Extract context from ToolMessage
-        for msg in reversed(messages):
-            if isinstance(msg, ToolMessage):
-                all_contexts.append(str(msg.content))
-                break
 
-    # Join multiple retrieval results
-    context = "\n\n".join(all_contexts)
+async def retrieval_node(state: QAState) -> QAState:
+    """Retrieval node: gathers context from vector store.
+
+    This node:
+    - Fans the sub-questions generated by the Planning Agent out concurrently
+      (bounded by `retrieval_max_concurrency`).
+    - In "agentic" mode each sub-question goes to the Retrieval Agent; in
+      "direct" mode all sub-questions are embedded in one batch and their
+      vector queries run concurrently, without an LLM call.
+    - Sub-questions matching the original question reuse the speculative
+      retrieval done during planning; if none matches, the speculative
+      results are merged in as additional context.
+    - Merges the retrieved chunks of all sub-queries, dropping duplicates and
+      renumbering them, in sub-question order so the context is deterministic.
+    - Stores the chunks in `state["documents"]`, their serialized form in
+      `state["context"]` and the best similarity score among them in
+      `state["retrieval_score"]`.
+    - Sub-questions still running when retrieval's share of the request
+      deadline runs out are cancelled; only finished ones are used
+      ("retrieval_partial").
+    """
+    sub_questions = state.get("sub_questions") or [state["question"]]
+    settings = get_settings()
+    mode = state.get("retrieval_mode") or settings.retrieval_mode
+    semaphore = asyncio.Semaphore(max(1, settings.retrieval_max_concurrency))
+
+    question = state["question"]
+    speculative_documents = state.get("speculative_documents")
+    reuses_speculation = [
+        speculative_documents is not None
+        and query_similarity(sq, question) >= settings.speculative_match_threshold
+        for sq in sub_questions
+    ]
+    reused_speculation = any(reuses_speculation)
+
+    # Direct mode: one embedding batch for every sub-question not reusing speculation
+    batched = {}
+    if mode == "direct":
+        fresh = [i for i, reuse in enumerate(reuses_speculation) if not reuse]
+        futures = start_retrieve_many(
+            [sub_questions[i] for i in fresh], k=settings.retrieval_k
+        )
+        batched = dict(zip(fresh, futures))
+    # No-op unless the graph is being streamed with the "custom" stream mode
+    write_event = get_stream_writer()
+    completed = 0
+
+    async def _retrieve_context(
+        index: int, sq: str
+    ) -> Tuple[str, List[Document]] | None:
+        nonlocal completed
+        if reuses_speculation[index]:
+            result = serialize_chunks(speculative_documents), speculative_documents
+        elif index in batched:
+            result = await batched[index]
+        else:
+            async with semaphore:
+                result = await _agentic_retrieve(sq)
+        completed += 1
+        write_event(
+            {
+                "event": "retrieval",
+                "data": {
+                    "index": index,
+                    "sub_question": sq,
+                    "found": bool(result and result[1]),
+                    "completed": completed,
+                    "total": len(sub_questions),
+                },
+            }
+        )
+        return result
+
+    tasks = [
+        asyncio.create_task(_retrieve_context(i, sq))
+        for i, sq in enumerate(sub_questions)
+    ]
+    done, pending = await asyncio.wait(
+        tasks, timeout=stage_budget(state, settings.deadline_retrieval_fraction)
+    )
+    for task in pending:
+        task.cancel()
+    update: QAState = degraded("retrieval_partial") if pending else {}
+
+    # Collect in sub-question order regardless of completion order
+    results = [task.result() for task in tasks if task in done]
+    results = [result for result in results if result is not None]
+
+    if speculative_documents is not None:
+        if reused_speculation:
+            increment("speculative.reused")
+        else:
+            # Planner rephrased everything: keep the raw-question hits as extra context
+            increment("speculative.merged")
+            results.append(
+                (serialize_chunks(speculative_documents), speculative_documents)
+            )
+
+    documents = deduplicate_chunks([docs for _ctx, docs in results])
+    scores = [doc.metadata.get("score") for doc in documents]
+    scores = [score for score in scores if score is not None]
+
+    # What joining the per-sub-question contexts would have cost instead
+    undeduplicated_tokens = count_tokens("\n\n".join(ctx for ctx, _docs in results))
+    deduplicated_tokens = count_tokens(serialize_chunks(documents))
+    tokens_saved = max(0, undeduplicated_tokens - deduplicated_tokens)
+    increment("dedup.tokens_saved", tokens_saved)
+
+    # Pack the most relevant chunks into the context token budget
+    context = serialize_chunks(documents, token_budget=settings.context_token_budget)
+    context_tokens = count_tokens(context)
+    increment("packing.tokens_dropped", max(0, deduplicated_tokens - context_tokens))
 
     return {
+        **update,
+        "documents": documents,
+        "retrieval_score": max(scores) if scores else None,
         "context": context,
+        "token_usage": {
+            "dedup_context_tokens_saved": tokens_saved,
+            "context_tokens": context_tokens,
+        },
     }
 
 
-def summarization_node(state: QAState) -> QAState:
+async def summarization_node(state: QAState) -> QAState:
     """Summarization Agent node: generates draft answer from context.
 
     This node:
     - Sends question + context to the Summarization Agent.
     - Agent responds with a draft answer grounded only in the context.
-    - Stores the draft answer in `state["draft_answer"]`.
+    - Stores the draft answer in `state["draft_answer"]` and its lexical
+      groundedness score in `state["groundedness"]`.
+    - If the request deadline passes first, returns a partial result carrying
+      only the retrieved context ("answer_unavailable").
     """
     question = state["question"]
     context = state.get("context")
 
     user_content = f"Question: {question}\n\nContext:\n{context}"
+    input_tokens = count_tokens(
+        SUMMARIZATION_SYSTEM_PROMPT + user_content,
+        get_agent_model_name("summarization"),
+    )
+    increment("tokens.summarization_input", input_tokens)
 
     agent = get_summarization_agent()
-    result = agent.invoke(
-        {"messages": [HumanMessage(content=user_content)]}
-    )
+    try:
+        result = await within(
+            _invoke_agent(agent, "summarization", user_content),
+            stage_budget(state),
+        )
+    except TimeoutError:
+        return {
+            "draft_answer": None,
+            "answer": DEADLINE_ANSWER,
+            "reason": "deadline_exceeded",
+            "partial": True,
+            "token_usage": {"summarization_input_tokens": input_tokens},
+            **degraded("answer_unavailable"),
+        }
     messages = result.get("messages", [])
     draft_answer = _extract_last_ai_content(messages)
+    groundedness = groundedness_score(
+        draft_answer,
+        context or "",
+        min_sentence_overlap=get_settings().grounding_sentence_overlap,
+    )
 
     return {
         "draft_answer": draft_answer,
+        "groundedness": groundedness,
+        "token_usage": {"summarization_input_tokens": input_tokens},
     }
 
 
-def verification_node(state: QAState) -> QAState:
+async def verification_node(state: QAState) -> QAState:
     """Verification Agent node: verifies and corrects the draft answer.
 
     This node:
     - Sends question + context + draft_answer to the Verification Agent.
     - Agent checks for hallucinations and unsupported claims.
     - Stores the final verified answer in `state["answer"]`.
+    - Falls back to the draft when too little of the request deadline is left
+      to verify it ("verification_skipped").
     """
     question = state["question"]
     context = state.get("context", "")
     draft_answer = state.get("draft_answer", "")
 
+    def _unverified() -> QAState:
+        return {
+            "answer": draft_answer,
+            "verified": False,
+            "reason": "answered",
+            **degraded("verification_skipped"),
+        }
+
+    remaining = time_left(state)
+    min_seconds = get_settings().deadline_min_verification_seconds
+    if remaining is not None and remaining < min_seconds:
+        return _unverified()
+
     user_content = f"""Question: {question}
 
 Context:
@@ -197,14 +452,61 @@ Draft Answer:
 {draft_answer}
 
 Please verify and correct the draft answer, removing any unsupported claims."""
+    input_tokens = count_tokens(
+        VERIFICATION_SYSTEM_PROMPT + user_content,
+        get_agent_model_name("verification"),
+    )
+    increment("tokens.verification_input", input_tokens)
 
     agent = get_verification_agent()
-    result = agent.invoke(
-        {"messages": [HumanMessage(content=user_content)]}
-    )
+    started = time.perf_counter()
+    try:
+        result = await within(
+            _invoke_agent(agent, "verification", user_content),
+            stage_budget(state),
+        )
+    except TimeoutError:
+        return {
+            **_unverified(),
+            "token_usage": {"verification_input_tokens": input_tokens},
+        }
+    observe_latency("verification", time.perf_counter() - started)
+    increment("verification.run")
     messages = result.get("messages", [])
     answer = _extract_last_ai_content(messages)
 
     return {
         "answer": answer,
+        "verified": True,
+        "reason": "answered",
+        "token_usage": {"verification_input_tokens": input_tokens},
+    }
+
+
+def accept_draft_node(state: QAState) -> QAState:
+    """Accept the draft answer without running the Verification Agent.
+
+    Used when the draft passed the local groundedness check. The latency saved
+    is estimated from the average observed verification latency.
+    """
+    increment("verification.skipped")
+    increment("verification.latency_saved_s", average_latency("verification"))
+    return {
+        "answer": state.get("draft_answer", ""),
+        "verified": False,
+        "reason": "answered",
+    }
+
+
+def not_found_node(state: QAState) -> QAState:
+    """Answer that the document does not cover the question.
+
+    Reached straight from retrieval when no chunk matches confidently, so the
+    Summarization and Verification Agents are never called.
+    """
+    increment("not_found.answers")
+    return {
+        "answer": NOT_FOUND_ANSWER,
+        "verified": False,
+        "reason": "not_found",
     }
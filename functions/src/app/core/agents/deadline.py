@@ -0,0 +1,50 @@
+"""Request deadline helpers for graph nodes.
+
+`run_qa_flow` stores an absolute `time.monotonic()` deadline in the state.
+Nodes use these helpers to bound their own work to a share of the time left
+and degrade (skip a stage, keep partial results) instead of overrunning.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, TypeVar
+
+from ..metrics import increment
+from .state import QAState
+
+T = TypeVar("T")
+
+# Answer returned when no draft could be generated before the deadline
+DEADLINE_ANSWER = (
+    "The answer could not be generated within the time limit. "
+    "The retrieved context is included for reference."
+)
+
+
+def time_left(state: QAState) -> float | None:
+    """Seconds until the request deadline (None when there is no deadline)."""
+    deadline = state.get("deadline")
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def stage_budget(state: QAState, fraction: float = 1.0) -> float | None:
+    """Share of the remaining time a stage may use (None when unbounded)."""
+    remaining = time_left(state)
+    if remaining is None:
+        return None
+    return max(0.0, remaining * fraction)
+
+
+async def within(awaitable: Awaitable[T], budget: float | None) -> T:
+    """Await `awaitable`, raising `TimeoutError` if it exceeds `budget` seconds."""
+    if budget is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout=budget)
+
+
+def degraded(name: str) -> dict:
+    """State update recording that degradation `name` was applied."""
+    increment(f"deadline.{name}")
+    return {"degradations": [name]}
@@ -0,0 +1,80 @@
+"""Cheap local groundedness check for draft answers.
+
+Used to decide whether the Verification Agent needs to run: a draft whose
+sentences are (almost) all lexically supported by the retrieved context is
+accepted as-is. Support is measured as unigram and bigram overlap of each
+sentence's content words with the context.
+"""
+
+import re
+from typing import List, Set, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+_STOPWORDS = frozenset(
+    """a an and are as at be been but by can do does for from has have how in
+    into is it its of on or that the their them there these they this to was
+    were what when where which who will with""".split()
+)
+
+# Sentences with fewer content words carry too little signal to score
+_MIN_SENTENCE_WORDS = 3
+
+
+def _content_words(text: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+
+
+def _bigrams(words: List[str]) -> Set[Tuple[str, str]]:
+    return set(zip(words, words[1:]))
+
+
+def sentence_overlap(
+    sentence: str, context_words: Set[str], context_bigrams: Set[Tuple[str, str]]
+) -> float:
+    """Fraction of a sentence's unigrams/bigrams found in the context (0..1)."""
+    words = _content_words(sentence)
+    if not words:
+        return 1.0
+    unigram_recall = sum(w in context_words for w in words) / len(words)
+    bigrams = _bigrams(words)
+    if not bigrams:
+        return unigram_recall
+    bigram_recall = sum(b in context_bigrams for b in bigrams) / len(bigrams)
+    return (unigram_recall + bigram_recall) / 2
+
+
+def groundedness_score(
+    draft: str, context: str, min_sentence_overlap: float = 0.6
+) -> float:
+    """Score how well `draft` is supported by `context`.
+
+    Args:
+        draft: Draft answer text.
+        context: Retrieved context the draft should be grounded in.
+        min_sentence_overlap: Overlap a sentence needs to count as supported.
+
+    Returns:
+        Fraction of scorable draft sentences that are supported (0.0 when the
+        draft or context is empty or has no scorable sentence).
+    """
+    if not draft.strip() or not context.strip():
+        return 0.0
+
+    context_tokens = _content_words(context)
+    context_words = set(context_tokens)
+    context_bigrams = _bigrams(context_tokens)
+
+    sentences = [
+        s for s in _SENTENCE_RE.split(draft)
+        if len(_content_words(s)) >= _MIN_SENTENCE_WORDS
+    ]
+    if not sentences:
+        return 0.0
+
+    supported = sum(
+        sentence_overlap(s, context_words, context_bigrams) >= min_sentence_overlap
+        for s in sentences
+    )
+    return supported / len(sentences)
@@ -1,6 +1,19 @@
 """LangGraph state schema for the multi-agent QA flow."""
 
-from typing import TypedDict
+import operator
+from typing import Annotated, Literal, TypedDict
+
+from langchain_core.documents import Document
+
+
+# Why the flow ended the way it did: a generated answer, the early "not in the
+# document" exit, or no answer before the deadline
+AnswerReason = Literal["answered", "not_found", "deadline_exceeded"]
+
+
+def merge_dicts(left: dict | None, right: dict | None) -> dict:
+    """State reducer merging per-node updates into one dictionary."""
+    return {**(left or {}), **(right or {})}
 
 
 class QAState(TypedDict):
@@ -8,14 +21,36 @@ class QAState(TypedDict):
 
     The state flows through several agents:
     1. Planning Agent: generates `plan` and `sub_questions` from `question`
-    2. Retrieval Agent: populates `context` from `sub_questions`
+       (skipped for simple questions, which become their own sole sub-question)
+    2. Retrieval Agent: populates `context` from `sub_questions` (either via the
+       agent or, in "direct" `retrieval_mode`, straight from the vector store);
+       the de-duplicated chunks are kept in `documents`; if even the best
+       `retrieval_score` is too low the flow ends with a "not found" answer
     3. Summarization Agent: generates `draft_answer` from `question` + `context`
     4. Verification Agent: produces final `answer` from `question` + `context` + `draft_answer`
+       (skipped, with `verified=False`, when the draft's `groundedness` is high enough)
     """
 
     question: str
+    # Absolute time.monotonic() deadline for the request (None = no deadline)
+    deadline: float | None
+    planning_mode: str | None
+    retrieval_mode: str | None
     plan: str | None
     sub_questions: list[str] | None
+    # Results of retrieving the raw question concurrently with planning
+    speculative_documents: list[Document] | None
+    documents: list[Document] | None
+    # Best similarity score among the retrieved chunks (None if unscored)
+    retrieval_score: float | None
     context: str | None
     draft_answer: str | None
+    groundedness: float | None
     answer: str | None
+    verified: bool | None
+    reason: AnswerReason | None
+    # Per-request token accounting, merged across nodes
+    token_usage: Annotated[dict[str, int], merge_dicts]
+    # Degradations applied to meet the deadline, and whether the answer is partial
+    degradations: Annotated[list[str], operator.add]
+    partial: bool
@@ -2,17 +2,18 @@
 
 from langchain_core.tools import tool
 
-from ..retrieval.vector_store import retrieve
-from ..retrieval.serialization import serialize_chunks
+from ..config import get_settings
+from ..retrieval.vector_store import aretrieve_many
 
 
 @tool(response_format="content_and_artifact")
-def retrieval_tool(query: str):
+async def retrieval_tool(query: str):
     """Search the vector database for relevant document chunks.
 
-    This tool retrieves the top 4 most relevant chunks from the Pinecone
-    vector store based on the query. The chunks are formatted with page
-    numbers and indices for easy reference.
+    This tool retrieves the most relevant chunks (`retrieval_k`, or fewer
+    when adaptive k drops weak matches) from the vector store based on the
+    query. The chunks are formatted with page numbers and indices for easy
+    reference.
 
     Args:
         query: The search query string to find relevant document chunks.
@@ -23,11 +24,9 @@ def retrieval_tool(query: str):
           with metadata. Format: "Chunk 1 (page=X): ...\n\nChunk 2 (page=Y): ..."
         - artifact: List of Document objects with full metadata for reference
     """
-    # Retrieve documents from vector store
-    docs = retrieve(query, k=4)
-
-    # Serialize chunks into formatted string (content)
-    context = serialize_chunks(docs)
+    # Retrieve documents from vector store, serialized into a formatted
+    # string (content); both come from the retrieval cache when possible
+    [(context, docs)] = await aretrieve_many([query], k=get_settings().retrieval_k)
 
     # Return tuple: (serialized content, artifact documents)
     # This follows LangChain's content_and_artifact response format
@@ -0,0 +1 @@
+"""Caches that let the QA pipeline skip repeated LLM and retrieval work."""
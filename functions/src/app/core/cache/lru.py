@@ -0,0 +1,81 @@
+"""A small thread-safe LRU cache with optional TTL expiry."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, List, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Bounded least-recently-used cache.
+
+    Entries are evicted once `max_entries` is exceeded (least recently used
+    first) and, when `ttl_seconds` is set, treated as missing once they are
+    older than the TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, inserted_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - inserted_at > self.ttl_seconds
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value for `key` (marking it recently used) or None."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or self._expired(item[0], now):
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: K, value: V) -> None:
+        """Insert or replace `key`, evicting least recently used entries."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def items(self) -> List[Tuple[K, V]]:
+        """Snapshot of live entries; does not affect recency or hit counts."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (inserted_at, value) in self._data.items()
+                if not self._expired(inserted_at, now)
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,85 @@
+"""Cache of vector-store retrieval results keyed by normalized query and `k`.
+
+Different user questions often decompose into the same sub-questions, so the
+retrieved `Document` lists (and their serialized CONTEXT form) are reused.
+Every entry records the index generation it was retrieved at; once
+`index_documents` bumps the generation, older entries are treated as misses.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+from .keys import normalize_text
+from .lru import LRUCache
+
+
+@dataclass
+class RetrievalCacheEntry:
+    generation: int
+    docs: List[Document]
+    serialized: str | None = None
+
+
+def _copy_docs(docs: List[Document]) -> List[Document]:
+    """Copy documents so callers cannot mutate cached metadata."""
+    return [doc.model_copy(update={"metadata": dict(doc.metadata)}) for doc in docs]
+
+
+class RetrievalCache:
+    """Bounded in-memory cache of retrieval results."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None) -> None:
+        self._entries: LRUCache[Tuple[str, int], RetrievalCacheEntry] = LRUCache(
+            max_entries, ttl_seconds
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @staticmethod
+    def _key(query: str, k: int) -> Tuple[str, int]:
+        return normalize_text(query), k
+
+    def get(self, query: str, k: int, generation: int) -> RetrievalCacheEntry | None:
+        """Return a copy of the entry for `(query, k)` if it is current."""
+        entry = self._entries.get(self._key(query, k))
+        with self._lock:
+            if entry is None or entry.generation != generation:
+                self.misses += 1
+                self.stale += entry is not None
+                return None
+            self.hits += 1
+        return RetrievalCacheEntry(entry.generation, _copy_docs(entry.docs), entry.serialized)
+
+    def set(
+        self,
+        query: str,
+        k: int,
+        generation: int,
+        docs: List[Document],
+        serialized: str | None = None,
+    ) -> None:
+        """Cache `docs` (and optionally their serialized form) for `(query, k)`."""
+        self._entries.set(
+            self._key(query, k),
+            RetrievalCacheEntry(generation, _copy_docs(docs), serialized),
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self._entries.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self._entries.evictions,
+        }
@@ -0,0 +1,146 @@
+"""Request hedging to cut tail latency of LLM and vector-store calls.
+
+If a call has not completed after a delay (a fixed value, or by default the
+observed p90 latency of that call type), an identical backup request is sent.
+Whichever finishes first wins and the other is cancelled. The share of calls
+that may be hedged is capped so the extra cost stays bounded.
+
+The percentiles are computed from every primary attempt, including the slow
+ones that lost to their backup: a cancelled primary contributes the time it
+had run so far (a lower bound of its latency), so the delay tracks the real
+tail instead of drifting down to the latency of the winners.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, TypeVar
+
+from .config import get_settings
+from .metrics import register_stats_provider
+
+T = TypeVar("T")
+
+# Number of recent latencies kept per call type for the percentile estimate
+_WINDOW = 500
+
+
+class _CallStats:
+    def __init__(self) -> None:
+        self.latencies: Deque[float] = deque(maxlen=_WINDOW)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        # Primaries cancelled before finishing (latency recorded as a lower bound)
+        self.censored = 0
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+
+_lock = threading.Lock()
+_stats: Dict[str, _CallStats] = {}
+
+
+def _get_stats(kind: str) -> _CallStats:
+    with _lock:
+        if kind not in _stats:
+            _stats[kind] = _CallStats()
+        return _stats[kind]
+
+
+def _hedge_delay(stats: _CallStats) -> float | None:
+    """Delay before hedging, or None when hedging is not possible yet."""
+    settings = get_settings()
+    if settings.hedge_delay_seconds is not None:
+        return settings.hedge_delay_seconds
+    with _lock:
+        if len(stats.latencies) < settings.hedge_min_samples:
+            return None
+        return stats.percentile(settings.hedge_percentile)
+
+
+def _take_hedge_budget(stats: _CallStats) -> bool:
+    with _lock:
+        if stats.hedged + 1 > stats.calls * get_settings().hedge_max_ratio:
+            return False
+        stats.hedged += 1
+        return True
+
+
+async def hedged(kind: str, call: Callable[[bool], Awaitable[T]]) -> T:
+    """Run `call`, sending a backup copy if it is slower than usual.
+
+    Args:
+        kind: Call type, e.g. "chat.summarization" or "vector"; latencies and
+            hedge budgets are tracked per type.
+        call: Factory creating the call; it receives True for the backup copy
+            (so it can e.g. disable streaming callbacks) and False otherwise.
+
+    Returns:
+        The result of whichever copy completes successfully first.
+    """
+    if not get_settings().hedging_enabled:
+        return await call(False)
+
+    stats = _get_stats(kind)
+    with _lock:
+        stats.calls += 1
+    delay = _hedge_delay(stats)
+    started = time.perf_counter()
+    primary = asyncio.ensure_future(call(False))
+    tasks = {primary}
+
+    def record_primary(task: "asyncio.Future[T]") -> None:
+        # Failures say nothing about how long a successful call takes
+        if not task.cancelled() and task.exception() is not None:
+            return
+        with _lock:
+            stats.latencies.append(time.perf_counter() - started)
+            stats.censored += task.cancelled()
+
+    primary.add_done_callback(record_primary)
+
+    try:
+        if delay is not None:
+            done, _pending = await asyncio.wait(tasks, timeout=delay)
+            if not done and _take_hedge_budget(stats):
+                tasks.add(asyncio.ensure_future(call(True)))
+
+        while True:
+            done, _pending = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                tasks.discard(task)
+                # A failed copy only loses if the other one can still succeed
+                if task.exception() is None or not tasks:
+                    with _lock:
+                        stats.hedge_wins += task is not primary
+                    return task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def hedging_stats() -> Dict[str, Any]:
+    """Per call type: calls, hedges sent and won, censored primaries and percentiles."""
+    with _lock:
+        return {
+            kind: {
+                "calls": s.calls,
+                "hedged": s.hedged,
+                "hedge_wins": s.hedge_wins,
+                "hedge_rate": s.hedged / s.calls if s.calls else 0.0,
+                "censored": s.censored,
+                "p50_ms": s.percentile(0.5) * 1000 if s.latencies else None,
+                "p90_ms": s.percentile(0.9) * 1000 if s.latencies else None,
+            }
+            for kind, s in _stats.items()
+        }
+
+
+register_stats_provider("hedging", hedging_stats)
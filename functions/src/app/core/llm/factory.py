@@ -1,22 +1,128 @@
 """Factory functions for creating LangChain v1 LLM instances."""
 
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterator, List
+
+import httpx
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
 from langchain_openai import ChatOpenAI
 
+from ..cache.llm_cache import get_llm_cache
 from ..config import get_settings
+from .rate_limit import get_rate_limiter
+from .tokens import count_tokens
+
+
+def _http_limits() -> httpx.Limits:
+    settings = get_settings()
+    return httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+    )
+
+
+def _http_timeout() -> httpx.Timeout:
+    settings = get_settings()
+    return httpx.Timeout(
+        settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds
+    )
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Get the keep-alive HTTP client shared by all sync OpenAI calls."""
+    return httpx.Client(limits=_http_limits(), timeout=_http_timeout())
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the keep-alive HTTP client shared by all async OpenAI calls."""
+    return httpx.AsyncClient(limits=_http_limits(), timeout=_http_timeout())
 
 
-def create_chat_model(temperature: float = 0.0) -> ChatOpenAI:
+class RateLimitedChatOpenAI(ChatOpenAI):
+    """ChatOpenAI that acquires chat rate-limit capacity before each request.
+
+    Capacity is requested for the prompt tokens plus the completion budget
+    (`max_tokens`, or `rate_limit_completion_tokens` when uncapped). Cache hits
+    are answered before these methods run and so cost no capacity.
+    """
+
+    def _estimate_tokens(self, messages: List[BaseMessage]) -> int:
+        prompt = sum(count_tokens(str(m.content), self.model_name) for m in messages)
+        completion = self.max_tokens or get_settings().rate_limit_completion_tokens
+        return prompt + completion
+
+    def _generate(
+        self, messages: List[BaseMessage], *args: Any, **kwargs: Any
+    ) -> ChatResult:
+        if (scheduler := get_rate_limiter("chat")) is not None:
+            scheduler.acquire_sync(self._estimate_tokens(messages))
+        return super()._generate(messages, *args, **kwargs)
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], *args: Any, **kwargs: Any
+    ) -> ChatResult:
+        if (scheduler := get_rate_limiter("chat")) is not None:
+            await scheduler.acquire(self._estimate_tokens(messages))
+        return await super()._agenerate(messages, *args, **kwargs)
+
+    def _stream(
+        self, messages: List[BaseMessage], *args: Any, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        if (scheduler := get_rate_limiter("chat")) is not None:
+            scheduler.acquire_sync(self._estimate_tokens(messages))
+        yield from super()._stream(messages, *args, **kwargs)
+
+    async def _astream(
+        self, messages: List[BaseMessage], *args: Any, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if (scheduler := get_rate_limiter("chat")) is not None:
+            await scheduler.acquire(self._estimate_tokens(messages))
+        async for chunk in super()._astream(messages, *args, **kwargs):
+            yield chunk
+
+
+def get_agent_model_name(agent: str | None = None) -> str:
+    """Model used for `agent` (`<agent>_model_name`, else `openai_model_name`)."""
+    settings = get_settings()
+    if agent is not None:
+        override = getattr(settings, f"{agent}_model_name", None)
+        if override:
+            return override
+    return settings.openai_model_name
+
+
+def create_chat_model(
+    temperature: float = 0.0, agent: str | None = None
+) -> ChatOpenAI:
     """Create a LangChain v1 ChatOpenAI instance.
 
+    All models share one pooled HTTP client per sync/async flavour, so agents
+    reuse warm keep-alive connections instead of each opening their own, and
+    go through the process-wide chat rate limiter.
+
     Args:
         temperature: Model temperature (default: 0.0 for deterministic outputs).
+        agent: Name of the agent the model is for; selects per-agent settings
+            such as the model name, `max_tokens` cap and whether responses are
+            served from the LLM cache.
 
     Returns:
         Configured ChatOpenAI instance.
     """
     settings = get_settings()
-    return ChatOpenAI(
-        model=settings.openai_model_name,
+    max_tokens = getattr(settings, f"{agent}_max_tokens", None) if agent else None
+    return RateLimitedChatOpenAI(
+        model=get_agent_model_name(agent),
         api_key=settings.openai_api_key,
         temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=_http_timeout(),
+        max_retries=settings.llm_max_retries,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        cache=get_llm_cache(agent),
     )
@@ -0,0 +1,125 @@
+"""Token counting with the OpenAI tokenizer (tiktoken).
+
+tiktoken downloads its BPE files on first use, so encodings are loaded in a
+background thread (started at app startup via `start_warm_up`). Until an
+encoding is available, or if it cannot be loaded at all (e.g. offline),
+counting falls back to a ~4 characters per token approximation so it never
+blocks or fails a request.
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, Optional
+
+import tiktoken
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English text with OpenAI tokenizers
+APPROX_CHARS_PER_TOKEN = 4
+
+_encodings: Dict[str, Optional[tiktoken.Encoding]] = {}
+_loading: set[str] = set()
+_lock = threading.Lock()
+
+
+def _load_encoding(model_name: str) -> Optional[tiktoken.Encoding]:
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            # Unknown or newer model names: fall back to the current OpenAI encoding
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        logger.warning(
+            "Could not load the tiktoken encoding for %s; token counts are approximate",
+            model_name,
+            exc_info=True,
+        )
+        return None
+
+
+def _warm_up(model_names: Iterable[str]) -> None:
+    for model_name in model_names:
+        encoding = _load_encoding(model_name)
+        with _lock:
+            _encodings[model_name] = encoding
+            _loading.discard(model_name)
+
+
+def start_warm_up(model_names: Iterable[str] | None = None) -> None:
+    """Load tokenizer encodings in a background thread.
+
+    Args:
+        model_names: Models to load encodings for (defaults to the configured
+            chat models). Models already loaded or loading are skipped.
+    """
+    if model_names is None:
+        settings = get_settings()
+        model_names = [
+            settings.openai_model_name,
+            settings.planning_model_name,
+            settings.retrieval_model_name,
+            settings.summarization_model_name,
+            settings.verification_model_name,
+        ]
+    with _lock:
+        pending = [
+            name
+            for name in dict.fromkeys(n for n in model_names if n)
+            if name not in _encodings and name not in _loading
+        ]
+        _loading.update(pending)
+    if pending:
+        threading.Thread(
+            target=_warm_up, args=(pending,), name="tiktoken-warm-up", daemon=True
+        ).start()
+
+
+def _get_encoding(model_name: str) -> Optional[tiktoken.Encoding]:
+    """Return the loaded encoding, or None while it is unavailable (never blocks)."""
+    with _lock:
+        if model_name in _encodings:
+            return _encodings[model_name]
+    start_warm_up([model_name])
+    return None
+
+
+def count_tokens(text: str, model_name: str | None = None) -> int:
+    """Count the tokens `text` occupies for the given (or configured) model.
+
+    Args:
+        text: Text to tokenize.
+        model_name: Model whose tokenizer to use (defaults to `openai_model_name`).
+
+    Returns:
+        Number of tokens (approximate if the encoding is not available).
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model_name or get_settings().openai_model_name)
+    if encoding is None:
+        return -(-len(text) // APPROX_CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: str | None = None) -> str:
+    """Cut `text` down to at most `max_tokens` tokens.
+
+    Args:
+        text: Text to truncate.
+        max_tokens: Maximum number of tokens to keep.
+        model_name: Model whose tokenizer to use (defaults to `openai_model_name`).
+
+    Returns:
+        The (possibly) shortened text.
+    """
+    encoding = _get_encoding(model_name or get_settings().openai_model_name)
+    if encoding is None:
+        return text[: max(0, max_tokens) * APPROX_CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[: max(0, max_tokens)])
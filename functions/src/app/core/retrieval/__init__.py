@@ -1,5 +1,19 @@
 """Retrieval module for vector store operations."""
 
-from .vector_store import get_retriever, retrieve
+from .vector_store import (
+    aretrieve,
+    aretrieve_context,
+    aretrieve_many,
+    get_retriever,
+    retrieve,
+    retrieve_many,
+)
 
-__all__ = ["get_retriever", "retrieve"]
+__all__ = [
+    "aretrieve",
+    "aretrieve_context",
+    "aretrieve_many",
+    "get_retriever",
+    "retrieve",
+    "retrieve_many",
+]
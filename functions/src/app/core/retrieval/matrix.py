@@ -0,0 +1,338 @@
+"""Embedding matrices backing the local vector store.
+
+`DenseMatrix` keeps L2-normalized rows in process memory. `QuantizedMatrix`
+keeps them on disk and opens them with `numpy.memmap`, so several uvicorn
+workers share one copy through the OS page cache: a compact int8/float16
+copy (with per-vector scale factors) is scanned for candidates, which are
+then rescored against the full-precision float32 rows.
+"""
+
+import copy
+import io
+import os
+import tempfile
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, Iterator, Literal
+
+import numpy as np
+
+MatrixDType = Literal["float32", "float16", "int8"]
+
+# Rows converted to float32 at a time when scoring or copying
+BLOCK_ROWS = 65_536
+
+
+def temporary_path(directory: Path, suffix: str) -> Path:
+    """Create a uniquely named empty file in `directory` to write, then rename.
+
+    Unique names keep concurrent writers (threads or worker processes) from
+    clobbering each other's temporary files.
+    """
+    fd, name = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=suffix)
+    os.close(fd)
+    return Path(name)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def block_scores(
+    rows: np.ndarray, query: np.ndarray, scales: np.ndarray | None = None
+) -> np.ndarray:
+    """Dot products of `rows` with a float32 `query`, optionally rescaled.
+
+    Non-float32 rows are upcast block by block so half-precision and int8
+    storage never materializes a full float32 copy.
+    """
+    if rows.dtype == np.float32:
+        scores = rows @ query
+    else:
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), BLOCK_ROWS):
+            block = np.asarray(rows[start : start + BLOCK_ROWS], dtype=np.float32)
+            scores[start : start + len(block)] = block @ query
+    if scales is not None:
+        scores *= scales
+    return scores
+
+
+def quantize(vectors: np.ndarray, dtype: MatrixDType) -> tuple[np.ndarray, np.ndarray]:
+    """Scalar-quantize float32 rows, returning (codes, per-row scales)."""
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    return vectors.astype(dtype), np.ones(len(vectors), dtype=np.float32)
+
+
+def _blocks(
+    array: np.ndarray | None, rows: np.ndarray | None = None
+) -> Iterator[np.ndarray]:
+    """Yield `array[rows]` (or all of `array`) in float-convertible blocks."""
+    if array is None:
+        return
+    count = len(array) if rows is None else len(rows)
+    for start in range(0, count, BLOCK_ROWS):
+        if rows is None:
+            yield np.asarray(array[start : start + BLOCK_ROWS])
+        else:
+            yield np.asarray(array[rows[start : start + BLOCK_ROWS]])
+
+
+def _tail(block: np.ndarray | None) -> Iterator[np.ndarray]:
+    if block is not None:
+        yield block
+
+
+class DenseMatrix:
+    """In-memory float32/float16 matrix; scores are exact."""
+
+    approximate = False
+
+    def __init__(self, dtype: MatrixDType = "float32") -> None:
+        if dtype == "int8":
+            raise ValueError("int8 quantization requires the memmap-backed store")
+        self.dtype = np.dtype(dtype)
+        # Rows [0, _size) are live; extra rows are spare capacity
+        self._vectors: np.ndarray | None = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        if self._vectors is None:
+            return np.empty((0, 0), dtype=self.dtype)
+        return self._vectors[: self._size]
+
+    def load(self, path: Path) -> None:
+        vectors = np.load(path / "vectors.npy")
+        self._vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        self._size = len(self._vectors)
+
+    def save(self, path: Path) -> None:
+        tmp = temporary_path(path, ".npy")
+        np.save(tmp, self.vectors)
+        os.replace(tmp, path / "vectors.npy")
+
+    def append(self, vectors: np.ndarray) -> None:
+        """Append normalized rows, growing the backing matrix geometrically."""
+        needed = self._size + len(vectors)
+        if self._vectors is None:
+            capacity = max(needed, 1024)
+            self._vectors = np.empty((capacity, vectors.shape[1]), dtype=self.dtype)
+        elif needed > len(self._vectors):
+            capacity = max(needed, 2 * len(self._vectors))
+            grown = np.empty((capacity, vectors.shape[1]), dtype=self.dtype)
+            grown[: self._size] = self._vectors[: self._size]
+            self._vectors = grown
+        self._vectors[self._size : needed] = vectors
+        self._size = needed
+
+    def snapshot(self) -> "DenseMatrix":
+        """Read-only view of the current rows that later writes do not affect.
+
+        Appends only write rows past the view's size (or into a new, grown array)
+        and deletes replace the array, so the shared buffer stays valid.
+        """
+        return copy.copy(self)
+
+    def select(self, keep: np.ndarray) -> None:
+        self._vectors = np.ascontiguousarray(self.vectors[keep])
+        self._size = len(self._vectors)
+
+    def scores(self, query: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        return block_scores(vectors, query)
+
+    def exact_scores(self, indices: np.ndarray, query: np.ndarray) -> np.ndarray:
+        return block_scores(self.vectors[indices], query)
+
+
+class QuantizedMatrix:
+    """Memory-mapped matrix with a quantized scan copy and float32 rescoring.
+
+    Files in `path`: `vectors.npy` (float32, used for rescoring only),
+    `codes.npy` (int8 or float16) and `scales.npy` (float32, one per row).
+    With `dtype="float32"` the full-precision rows are scanned directly.
+    Appends extend the files in place; only deletes rewrite them.
+    """
+
+    def __init__(self, path: Path, dtype: MatrixDType = "int8") -> None:
+        self.path = path
+        self.dtype = dtype
+        self.approximate = dtype != "float32"
+        self._full: np.ndarray | None = None
+        self._codes: np.ndarray | None = None
+        self._scales: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return 0 if self._full is None else len(self._full)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        if self._full is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._full
+
+    def load(self, path: Path) -> None:
+        """(Re)open the memory maps; rows are paged in lazily by the OS."""
+        self._full = np.load(path / "vectors.npy", mmap_mode="r")
+        if not self.approximate:
+            return
+        if not (path / "codes.npy").exists():
+            # Store written with another dtype: build the scan copy once
+            self._rewrite_scan_copy()
+        self._codes = np.load(path / "codes.npy", mmap_mode="r")
+        self._scales = np.load(path / "scales.npy", mmap_mode="r")
+        if self._codes.dtype != np.dtype(self.dtype):
+            self._rewrite_scan_copy()
+            self._codes = np.load(path / "codes.npy", mmap_mode="r")
+            self._scales = np.load(path / "scales.npy", mmap_mode="r")
+
+    def save(self, path: Path) -> None:
+        # Appends and deletes are written through to disk immediately
+        pass
+
+    def _write(
+        self, name: str, dtype, shape: tuple, blocks: Iterable[np.ndarray]
+    ) -> None:
+        """Stream `blocks` into a new .npy file and atomically replace `name`."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = temporary_path(self.path, ".npy")
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+        offset = 0
+        for block in blocks:
+            out[offset : offset + len(block)] = block
+            offset += len(block)
+        out.flush()
+        del out
+        os.replace(tmp, self.path / f"{name}.npy")
+
+    def _rewrite_scan_copy(self) -> None:
+        full = self.vectors
+        self._write(
+            "codes", self.dtype, full.shape,
+            (quantize(block, self.dtype)[0] for block in _blocks(full)),
+        )
+        self._write(
+            "scales", np.float32, (len(full),),
+            (quantize(block, self.dtype)[1] for block in _blocks(full)),
+        )
+
+    def _rewrite(self, rows: np.ndarray | None, extra: np.ndarray | None) -> None:
+        """Rewrite every file keeping `rows` (all when None) plus `extra`."""
+        dim = extra.shape[1] if extra is not None else self.vectors.shape[1]
+        kept = len(self) if rows is None else len(rows)
+        total = kept + (0 if extra is None else len(extra))
+        codes, scales = (None, None)
+        if extra is not None and self.approximate:
+            codes, scales = quantize(extra, self.dtype)
+        self._write(
+            "vectors", np.float32, (total, dim),
+            chain(_blocks(self._full, rows), _tail(extra)),
+        )
+        if self.approximate:
+            self._write(
+                "codes", self.dtype, (total, dim),
+                chain(_blocks(self._codes, rows), _tail(codes)),
+            )
+            self._write(
+                "scales", np.float32, (total,),
+                chain(_blocks(self._scales, rows), _tail(scales)),
+            )
+        self.load(self.path)
+
+    def _extend(self, name: str, rows: np.ndarray) -> bool:
+        """Append `rows` to `name`.npy in place.
+
+        The new rows are written after the existing data before the header's
+        shape is updated, so readers never see rows that are not there yet.
+
+        Returns:
+            False (nothing written) if the longer shape no longer fits in the
+            header's padding; the caller must rewrite the file instead.
+        """
+        with open(self.path / f"{name}.npy", "r+b") as file:
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            data_offset = file.tell()
+            if fortran_order or rows.shape[1:] != shape[1:]:
+                return False
+            header = io.BytesIO()
+            header_data = {
+                "descr": np.lib.format.dtype_to_descr(dtype),
+                "fortran_order": False,
+                "shape": (shape[0] + len(rows), *shape[1:]),
+            }
+            if version == (1, 0):
+                np.lib.format.write_array_header_1_0(header, header_data)
+            else:
+                np.lib.format.write_array_header_2_0(header, header_data)
+            if header.tell() != data_offset:
+                return False
+            file.seek(data_offset + int(np.prod(shape)) * dtype.itemsize)
+            file.write(np.ascontiguousarray(rows, dtype=dtype).tobytes())
+            file.truncate()
+            file.flush()
+            os.fsync(file.fileno())
+            file.seek(0)
+            file.write(header.getvalue())
+        return True
+
+    def append(self, vectors: np.ndarray) -> None:
+        vectors = vectors.astype(np.float32)
+        if not len(self) or vectors.shape[1] != self.vectors.shape[1]:
+            self._rewrite(None, vectors)
+            return
+        files = [("vectors", vectors)]
+        if self.approximate:
+            codes, scales = quantize(vectors, self.dtype)
+            files += [("codes", codes), ("scales", scales)]
+        current = {"vectors": self._full, "codes": self._codes, "scales": self._scales}
+        for position, (name, rows) in enumerate(files):
+            if not self._extend(name, rows):
+                # Header padding used up (rare): rewrite this file and the rest
+                for other, other_rows in files[position:]:
+                    existing = current[other]
+                    self._write(
+                        other, existing.dtype,
+                        (len(existing) + len(other_rows), *existing.shape[1:]),
+                        chain(_blocks(existing), _tail(other_rows)),
+                    )
+                break
+        self.load(self.path)
+
+    def select(self, keep: np.ndarray) -> None:
+        self._rewrite(keep, None)
+
+    def snapshot(self) -> "QuantizedMatrix":
+        """Read-only view of the current rows that later writes do not affect.
+
+        Appends only write past the mapped rows and deletes replace the files,
+        so the view's memory maps stay valid.
+        """
+        return copy.copy(self)
+
+    def scores(self, query: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        if not self.approximate:
+            vectors = self.vectors if rows is None else self.vectors[rows]
+            return block_scores(vectors, query)
+        if rows is None:
+            return block_scores(self._codes, query, np.asarray(self._scales))
+        return block_scores(self._codes[rows], query, self._scales[rows])
+
+    def exact_scores(self, indices: np.ndarray, query: np.ndarray) -> np.ndarray:
+        return np.asarray(self.vectors[indices], dtype=np.float32) @ query
@@ -0,0 +1,181 @@
+"""Pinecone vector store with a configurable, connection-reusing transport.
+
+`langchain_pinecone.PineconeVectorStore` opens (and closes) a new asyncio
+client for every async call, and runs sync calls over whatever client it was
+given. `PooledPineconeVectorStore` keeps its clients for the life of the
+process instead:
+
+- "http": the REST client with a sized urllib3 connection pool; async calls
+  run it in a worker thread.
+- "grpc": the gRPC client (requires `pinecone[grpc]`), multiplexing requests
+  over one long-lived HTTP/2 channel; async calls run it in a worker thread.
+- "asyncio": one aiohttp-based `IndexAsyncio` per event loop, kept open so
+  its keep-alive connections are reused across queries. Sync upserts from
+  worker threads run on the app's event loop (see `set_main_loop`), whose
+  shared async HTTP clients must not be used from short-lived loops.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_pinecone import PineconeVectorStore
+from pinecone import Pinecone
+
+from ..config import PineconeTransport
+
+_main_loop: asyncio.AbstractEventLoop | None = None
+
+
+def set_main_loop(loop: asyncio.AbstractEventLoop | None) -> None:
+    """Register the app's event loop for async work started from worker threads."""
+    global _main_loop
+    _main_loop = loop
+
+
+class _GRPCUpsertResult:
+    """Gives gRPC upsert futures the `.get()` langchain expects of ApplyResult."""
+
+    def __init__(self, future) -> None:
+        self._future = future
+
+    def get(self):
+        return self._future.result()
+
+
+class _GRPCIndex:
+    """Thin proxy around a `GRPCIndex` for langchain's parallel upserts."""
+
+    def __init__(self, index) -> None:
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._index, name)
+
+    def upsert(self, *args, async_req: bool = False, **kwargs):
+        result = self._index.upsert(*args, async_req=async_req, **kwargs)
+        return _GRPCUpsertResult(result) if async_req else result
+
+
+def create_pinecone_index(
+    api_key: str,
+    transport: PineconeTransport,
+    host: str,
+    pool_threads: int,
+    connection_pool_maxsize: int,
+):
+    """Create the long-lived sync index client for `transport`."""
+    if transport == "grpc":
+        from pinecone.grpc import PineconeGRPC
+
+        client = PineconeGRPC(api_key=api_key)
+        return _GRPCIndex(client.Index(host=host, pool_threads=pool_threads))
+    client = Pinecone(api_key=api_key, pool_threads=pool_threads)
+    return client.Index(
+        host=host,
+        pool_threads=pool_threads,
+        connection_pool_maxsize=connection_pool_maxsize,
+    )
+
+
+class PooledPineconeVectorStore(PineconeVectorStore):
+    """`PineconeVectorStore` that reuses its transport's connections.
+
+    Args:
+        index: Sync index client from `create_pinecone_index`.
+        embedding: Embeddings model.
+        transport: "http", "grpc" or "asyncio".
+        api_key: Pinecone API key (used for the asyncio clients).
+        connection_pool_maxsize: Connection pool size of the asyncio clients.
+    """
+
+    def __init__(
+        self,
+        index: Any,
+        embedding: Embeddings,
+        transport: PineconeTransport,
+        api_key: str,
+        connection_pool_maxsize: int,
+    ) -> None:
+        super().__init__(index=index, embedding=embedding)
+        self.transport = transport
+        self._api_key = api_key
+        self._connection_pool_maxsize = connection_pool_maxsize
+        self._async_indexes: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    # -- asyncio transport -------------------------------------------------
+
+    @asynccontextmanager
+    async def _async_index_context(self) -> AsyncIterator[Any]:
+        # Replaces the per-call client of the base class with one per event loop
+        loop = asyncio.get_running_loop()
+        index = self._async_indexes.get(loop)
+        if index is None:
+            client = Pinecone(api_key=self._api_key)
+            index = client.IndexAsyncio(
+                host=self._index_host,
+                connection_pool_maxsize=self._connection_pool_maxsize,
+            )
+            self._async_indexes[loop] = index
+        yield index
+
+    async def aclose(self) -> None:
+        """Close the asyncio client of the running event loop, if any."""
+        index = self._async_indexes.pop(asyncio.get_running_loop(), None)
+        if index is not None:
+            await index.close()
+
+    # -- transport dispatch --------------------------------------------------
+
+    async def asimilarity_search_by_vector_with_score(
+        self, embedding: List[float], *, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        if self.transport == "asyncio":
+            return await super().asimilarity_search_by_vector_with_score(
+                embedding, k=k, **kwargs
+            )
+        # The sync clients are thread-safe and pool their connections
+        return await asyncio.to_thread(
+            self.similarity_search_by_vector_with_score, embedding, k=k, **kwargs
+        )
+
+    async def aadd_texts(
+        self,
+        texts,
+        metadatas: List[dict] | None = None,
+        ids: List[str] | None = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        if self.transport == "asyncio":
+            return await super().aadd_texts(texts, metadatas, ids, **kwargs)
+        return await asyncio.to_thread(self.add_texts, texts, metadatas, ids, **kwargs)
+
+    def add_texts(
+        self,
+        texts,
+        metadatas: List[dict] | None = None,
+        ids: List[str] | None = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        if self.transport != "asyncio":
+            return super().add_texts(texts, metadatas, ids, **kwargs)
+
+        # Sync callers (indexing runs in a worker thread) borrow the app's loop:
+        # the async embeddings and Pinecone clients are bound to it
+        loop = _main_loop
+        if loop is not None and loop.is_running() and not _on_loop(loop):
+            return asyncio.run_coroutine_threadsafe(
+                self.aadd_texts(texts, metadatas, ids, **kwargs), loop
+            ).result()
+        # No app loop to borrow (e.g. scripts): use the pooled sync client
+        return super().add_texts(texts, metadatas, ids, **kwargs)
+
+
+def _on_loop(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
@@ -4,21 +4,30 @@ from typing import List
 
 from langchain_core.documents import Document
 
+from .context import pack_chunks
 
-def serialize_chunks(docs: List[Document]) -> str:
+
+def serialize_chunks(docs: List[Document], token_budget: int | None = None) -> str:
     """Serialize a list of Document objects into a formatted CONTEXT string.
 
     Formats chunks with indices and page numbers as specified in the PRD:
     - Chunks are numbered (Chunk 1, Chunk 2, etc.)
     - Page numbers are included in the format "page=X"
     - Produces a clean CONTEXT section for agent consumption
+    - When `token_budget` is given, chunks are first packed into the budget
+      with `pack_chunks` (most relevant first, low-ranked chunks dropped or
+      truncated)
 
     Args:
         docs: List of Document objects with metadata.
+        token_budget: Optional maximum size of the serialized context in tokens.
 
     Returns:
-        Formatted string with all chunks serialized.
+        Formatted string with all (packed) chunks serialized.
     """
+    if token_budget is not None:
+        docs = pack_chunks(docs, token_budget)
+
     context_parts = []
 
     for idx, doc in enumerate(docs, start=1):
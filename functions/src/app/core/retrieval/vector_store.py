@@ -1,51 +1,177 @@
-"""Vector store wrapper for Pinecone integration with LangChain."""
+"""Vector store wrapper for Pinecone integration with LangChain.
 
+The backend is chosen by `vector_store_backend`: Pinecone (default) or the
+in-process `LocalVectorStore`.
+"""
+
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from functools import lru_cache
-from typing import List
+from typing import List, Tuple
 
 from pinecone import Pinecone
 from langchain_core.documents import Document
-from langchain_pinecone import PineconeVectorStore
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 
-from ..config import get_settings
+from ..cache.embedding_cache import CachedQueryEmbeddings, cache_query_embeddings
+from ..cache.retrieval_cache import RetrievalCache
+from ..config import Settings, get_settings
+from ..hedging import hedged
+from ..llm.batching import batch_embeddings
+from ..llm.factory import get_async_http_client, get_http_client
+from ..llm.rate_limit import Priority, RateLimitedEmbeddings, llm_priority
+from ..metrics import increment, register_stats_provider
+from .context import select_by_score
+from .generation import IndexGeneration
+from .ivf import IVFIndex
+from .local_store import LocalVectorStore
+from .pinecone_store import PooledPineconeVectorStore, create_pinecone_index
+from .serialization import serialize_chunks
+
+@lru_cache(maxsize=1)
+def _get_index_generation() -> IndexGeneration:
+    """Create the generation counter shared by this host's workers."""
+    path = get_settings().index_generation_path
+    if path is None:
+        path = Path(tempfile.gettempdir()) / "rag_index_generation"
+    return IndexGeneration(Path(path))
+
+
+def get_index_generation() -> int:
+    """Return the current index generation (incremented by `index_documents`).
+
+    Bumped whenever new content is indexed so caches can drop stale entries.
+    """
+    return _get_index_generation().get()
 
 
 @lru_cache(maxsize=1)
-def _get_vector_store() -> PineconeVectorStore:
-    """Create a PineconeVectorStore instance configured from settings."""
+def _get_retrieval_cache() -> RetrievalCache | None:
+    """Create the retrieval result cache, or None when it is disabled."""
     settings = get_settings()
+    if not settings.retrieval_cache_enabled:
+        return None
+    cache = RetrievalCache(
+        max_entries=settings.retrieval_cache_max_entries,
+        ttl_seconds=settings.retrieval_cache_ttl_seconds,
+    )
+    register_stats_provider("retrieval_cache", cache.stats)
+    return cache
 
-    pc = Pinecone(api_key=settings.pinecone_api_key.strip())
-    index = pc.Index(settings.pinecone_index_name)
-
-    # Fetch the actual index dimension so embeddings always match
-    index_description = pc.describe_index(settings.pinecone_index_name)
-    index_dimension = index_description.dimension
 
+def _create_embeddings(settings: Settings, dimensions: int | None) -> Embeddings:
+    """Build the OpenAI embeddings stack (rate limiting, batching, query cache)."""
     embeddings = OpenAIEmbeddings(
         model=settings.openai_embedding_model_name,
         api_key=settings.openai_api_key,
-        dimensions=index_dimension,  # match the Pinecone index dimension
+        dimensions=dimensions,
+        max_retries=settings.llm_max_retries,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+    embeddings = RateLimitedEmbeddings(
+        embeddings,
+        model_name=settings.openai_embedding_model_name,
+        batch_size=embeddings.chunk_size,
     )
+    if settings.embedding_batching_enabled:
+        # Query embeddings from concurrent requests share one API call
+        embeddings = batch_embeddings(
+            embeddings,
+            window_seconds=settings.embedding_batch_window_ms / 1000,
+            max_batch_size=settings.embedding_batch_max_size,
+        )
+    # Query vectors are cached per (model, dimension); hits skip the rate limiter
+    return cache_query_embeddings(
+        embeddings, settings.openai_embedding_model_name, dimensions
+    )
+
+
+def _create_pinecone_store(settings: Settings) -> PooledPineconeVectorStore:
+    """Create a Pinecone vector store on the configured transport."""
+    api_key = settings.pinecone_api_key.strip()
+    host = settings.pinecone_index_host
+    index_dimension = settings.pinecone_index_dimension
+    if host is None or index_dimension is None:
+        # Fetch the actual index host and dimension so embeddings always match
+        description = Pinecone(api_key=api_key).describe_index(
+            settings.pinecone_index_name
+        )
+        host = host or description.host
+        index_dimension = index_dimension or description.dimension
 
-    return PineconeVectorStore(
+    index = create_pinecone_index(
+        api_key,
+        transport=settings.pinecone_transport,
+        host=host,
+        pool_threads=settings.pinecone_pool_threads,
+        connection_pool_maxsize=settings.pinecone_connection_pool_maxsize,
+    )
+    return PooledPineconeVectorStore(
         index=index,
-        embedding=embeddings,
+        embedding=_create_embeddings(settings, index_dimension),
+        transport=settings.pinecone_transport,
+        api_key=api_key,
+        connection_pool_maxsize=settings.pinecone_connection_pool_maxsize,
+    )
+
+
+def _create_local_store(settings: Settings) -> LocalVectorStore:
+    """Create an in-process LocalVectorStore configured from settings."""
+    path = settings.local_store_path
+    if path is None and settings.local_store_memmap:
+        path = Path(tempfile.gettempdir()) / "local_vector_store"
+    ivf = None
+    if settings.local_store_index == "ivf":
+        ivf = IVFIndex(
+            n_lists=settings.local_ivf_lists,
+            n_probe=settings.local_ivf_probe,
+            min_rows=settings.local_ivf_min_rows,
+        )
+    return LocalVectorStore(
+        embedding=_create_embeddings(settings, settings.local_embedding_dimensions),
+        path=path,
+        dtype=settings.local_store_dtype,
+        memmap=settings.local_store_memmap,
+        rescore_factor=settings.local_store_rescore_factor,
+        ivf=ivf,
     )
 
+
+@lru_cache(maxsize=1)
+def _get_vector_store() -> VectorStore:
+    """Create the vector store for the configured backend."""
+    settings = get_settings()
+    if settings.vector_store_backend == "local":
+        return _create_local_store(settings)
+    return _create_pinecone_store(settings)
+
+
+def get_embeddings() -> Embeddings:
+    """Get the embeddings model used by the vector store."""
+    return _get_vector_store().embeddings
+
+
+async def aembed_query(text: str) -> List[float]:
+    """Embed a query string with the vector store's embeddings model."""
+    return await get_embeddings().aembed_query(text)
+
+
 def get_retriever(k: int | None = None):
-    """Get a Pinecone retriever instance.
+    """Get a retriever over the configured vector store.
 
     Args:
         k: Number of documents to retrieve (defaults to config value).
 
     Returns:
-        PineconeVectorStore instance configured as a retriever.
+        VectorStoreRetriever for the configured backend.
     """
     settings = get_settings()
     if k is None:
@@ -55,8 +181,221 @@ def get_retriever(k: int | None = None):
     return vector_store.as_retriever(search_kwargs={"k": k})
 
 
+def _cached_result(
+    query: str, k: int, generation: int, serialize: bool
+) -> Tuple[str, List[Document]] | None:
+    """Return (serialized_context, documents) from the retrieval cache, if any."""
+    cache = _get_retrieval_cache()
+    if cache is None:
+        return None
+    entry = cache.get(query, k, generation)
+    if entry is None:
+        return None
+    if entry.serialized is None and serialize:
+        entry.serialized = serialize_chunks(entry.docs)
+        cache.set(query, k, generation, entry.docs, entry.serialized)
+    return entry.serialized or "", entry.docs
+
+
+def _store_result(
+    query: str, k: int, generation: int, docs: List[Document], serialize: bool
+) -> Tuple[str, List[Document]]:
+    serialized = serialize_chunks(docs) if serialize else None
+    cache = _get_retrieval_cache()
+    if cache is not None:
+        cache.set(query, k, generation, docs, serialized)
+    return serialized or "", docs
+
+
+def _adaptive_k_enabled() -> bool:
+    settings = get_settings()
+    return (
+        settings.retrieval_score_floor is not None
+        or settings.retrieval_relative_margin is not None
+    )
+
+
+def _fetch_k(k: int) -> int:
+    """Number of candidates to fetch for a request of `k` documents."""
+    if not _adaptive_k_enabled():
+        return k
+    return max(k, get_settings().retrieval_max_k or k)
+
+
+def _scored(results: List[Tuple[Document, float]], k: int) -> List[Document]:
+    """Documents from (document, score) pairs, keeping the score in metadata.
+
+    With adaptive k enabled, weak matches are dropped from the over-fetched
+    candidates (see `select_by_score`).
+    """
+    for doc, score in results:
+        doc.metadata["score"] = float(score)
+    docs = [doc for doc, _score in results]
+    if not _adaptive_k_enabled():
+        return docs
+    settings = get_settings()
+    selected = select_by_score(
+        docs,
+        min_k=min(settings.retrieval_min_k, k),
+        max_k=_fetch_k(k),
+        score_floor=settings.retrieval_score_floor,
+        relative_margin=settings.retrieval_relative_margin,
+    )
+    increment("retrieval.adaptive_chunks_dropped", len(docs) - len(selected))
+    return selected
+
+
+def embed_queries(queries: List[str]) -> List[List[float]]:
+    """Embed several queries in one batch (cached queries are not re-sent)."""
+    embeddings = get_embeddings()
+    if isinstance(embeddings, CachedQueryEmbeddings):
+        return embeddings.embed_queries(queries)
+    return embeddings.embed_documents(queries)
+
+
+async def aembed_queries(queries: List[str]) -> List[List[float]]:
+    """Async counterpart of `embed_queries`."""
+    embeddings = get_embeddings()
+    if isinstance(embeddings, CachedQueryEmbeddings):
+        return await embeddings.aembed_queries(queries)
+    return await embeddings.aembed_documents(queries)
+
+
+def retrieve_many(queries: List[str], k: int | None = None) -> List[List[Document]]:
+    """Retrieve documents for several queries at once.
+
+    Cache misses are embedded in a single batch and their vector queries run
+    concurrently (bounded by `retrieval_max_concurrency`). Each document's
+    similarity score is stored in `metadata["score"]`; with adaptive k
+    enabled, weakly matching chunks are dropped from the result.
+
+    Args:
+        queries: Search query strings.
+        k: Number of documents to retrieve per query (defaults to config value).
+
+    Returns:
+        One list of Document objects per query, in query order.
+    """
+    settings = get_settings()
+    k = k or settings.retrieval_k
+    generation = get_index_generation()
+    hits = [_cached_result(query, k, generation, serialize=False) for query in queries]
+    missing = [query for query, hit in zip(queries, hits) if hit is None]
+    found: List[List[Document]] = []
+    if missing:
+        vectors = embed_queries(missing)
+        store = _get_vector_store()
+        workers = max(1, min(len(missing), settings.retrieval_max_concurrency))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            found = list(
+                pool.map(
+                    lambda vector: _scored(
+                        store.similarity_search_by_vector_with_score(
+                            vector, k=_fetch_k(k)
+                        ),
+                        k,
+                    ),
+                    vectors,
+                )
+            )
+        for query, docs in zip(missing, found):
+            _store_result(query, k, generation, docs, serialize=False)
+
+    fresh = iter(found)
+    return [hit[1] if hit is not None else next(fresh) for hit in hits]
+
+
+def start_retrieve_many(
+    queries: List[str], k: int | None = None, serialize: bool = True
+) -> List["asyncio.Future[Tuple[str, List[Document]]]"]:
+    """Start retrieving several queries as one batch, one future per query.
+
+    Cache hits resolve immediately. All misses share a single embedding
+    call; each then runs its (hedged) vector query as soon as the batch is
+    embedded, so callers can consume or cancel results individually.
+
+    Args:
+        queries: Search query strings.
+        k: Number of documents to retrieve per query (defaults to config value).
+        serialize: Whether to build the serialized context string.
+
+    Returns:
+        Futures of (serialized_context, documents), in query order.
+    """
+    settings = get_settings()
+    k = k or settings.retrieval_k
+    generation = get_index_generation()
+    hits = [_cached_result(query, k, generation, serialize) for query in queries]
+    missing = [query for query, hit in zip(queries, hits) if hit is None]
+    embedded = None
+    if missing:
+        embedded = asyncio.ensure_future(aembed_queries(missing))
+        # Retrieve the exception even if every query task is cancelled
+        embedded.add_done_callback(lambda f: f.cancelled() or f.exception())
+    semaphore = asyncio.Semaphore(max(1, settings.retrieval_max_concurrency))
+    store = _get_vector_store()
+
+    async def _retrieve(query: str, position: int) -> Tuple[str, List[Document]]:
+        vectors = await asyncio.shield(embedded)
+        async with semaphore:
+            results = await hedged(
+                "vector",
+                lambda _is_hedge: store.asimilarity_search_by_vector_with_score(
+                    vectors[position], k=_fetch_k(k)
+                ),
+            )
+        return _store_result(query, k, generation, _scored(results, k), serialize)
+
+    futures = []
+    positions = iter(range(len(missing)))
+    for query, hit in zip(queries, hits):
+        if hit is None:
+            futures.append(asyncio.ensure_future(_retrieve(query, next(positions))))
+        else:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(hit)
+            futures.append(future)
+    return futures
+
+
+async def aretrieve_many(
+    queries: List[str], k: int | None = None, serialize: bool = True
+) -> List[Tuple[str, List[Document]]]:
+    """Asynchronously retrieve several queries with one embedding call.
+
+    Args:
+        queries: Search query strings.
+        k: Number of documents to retrieve per query (defaults to config value).
+        serialize: Whether to build the serialized context strings (when
+            False the returned strings may be empty).
+
+    Returns:
+        One (serialized_context, documents) tuple per query, in query order.
+    """
+    return list(await asyncio.gather(*start_retrieve_many(queries, k, serialize)))
+
+
 def retrieve(query: str, k: int | None = None) -> List[Document]:
-    """Retrieve documents from Pinecone for a given query.
+    """Retrieve documents from the vector store for a given query.
+
+    Results are served from the retrieval cache when an entry for the same
+    normalized query and `k` exists for the current index generation.
+
+    Args:
+        query: Search query string.
+        k: Number of documents to retrieve (defaults to config value).
+
+    Returns:
+        List of Document objects with metadata (including page numbers).
+    """
+    return retrieve_many([query], k=k)[0]
+
+
+async def aretrieve(query: str, k: int | None = None) -> List[Document]:
+    """Asynchronously retrieve documents from the vector store for a query.
+
+    Async counterpart of `retrieve` used by the QA graph so that a request
+    waiting on embeddings or the vector store does not block the event loop.
 
     Args:
         query: Search query string.
@@ -65,11 +404,33 @@ def retrieve(query: str, k: int | None = None) -> List[Document]:
     Returns:
         List of Document objects with metadata (including page numbers).
     """
-    retriever = get_retriever(k=k)
-    return retriever.invoke(query)
+    _context, docs = await aretrieve_context(query, k=k, serialize=False)
+    return docs
+
+
+async def aretrieve_context(
+    query: str, k: int | None = None, serialize: bool = True
+) -> Tuple[str, List[Document]]:
+    """Retrieve documents for a query together with their serialized CONTEXT.
+
+    Both the documents and the serialized string are cached, so repeated
+    sub-questions skip the vector query and re-serialization.
+
+    Args:
+        query: Search query string.
+        k: Number of documents to retrieve (defaults to config value).
+        serialize: Whether to build the serialized string on a miss (when
+            False the returned string may be empty).
+
+    Returns:
+        Tuple of (serialized_context, documents).
+    """
+    (result,) = await aretrieve_many([query], k=k, serialize=serialize)
+    return result
+
 
 def index_documents(file_path: Path) -> int:
-    """Index a list of Document objects into the Pinecone vector store.
+    """Index a list of Document objects into the configured vector store.
 
     Args:
         docs: Documents to embed and upsert into the vector index.
@@ -84,5 +445,8 @@ def index_documents(file_path: Path) -> int:
     texts = text_splitter.split_documents(docs)
 
     vector_store = _get_vector_store()
-    vector_store.add_documents(texts)
-    return len(texts)
\ No newline at end of file
+    # Bulk embedding work yields to interactive QA traffic
+    with llm_priority(Priority.BULK):
+        vector_store.add_documents(texts)
+    _get_index_generation().bump()
+    return len(texts)
@@ -5,18 +5,89 @@ with the multi-agent RAG pipeline without depending directly on LangGraph
 or agent implementation details.
 """
 
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, Tuple
 
-from ..core.agents.graph import run_qa_flow
+from ..core.agents.graph import run_qa_flow, stream_qa_flow
+from ..core.cache.answer_cache import cache_variant, get_answer_cache
 
 
-def answer_question(question: str) -> Dict[str, Any]:
+async def answer_question(
+    question: str,
+    retrieval_mode: str | None = None,
+    planning_mode: str | None = None,
+    timeout_seconds: float | None = None,
+) -> Dict[str, Any]:
     """Run the multi-agent QA flow for a given question.
 
     Args:
         question: User's natural language question about the vector databases paper.
+        retrieval_mode: Optional override of the configured retrieval mode.
+        planning_mode: Optional override of the configured planning mode.
+        timeout_seconds: Optional request deadline (capped by `Settings`).
 
     Returns:
-        Dictionary containing at least `answer` and `context` keys.
+        Dictionary containing at least `answer` and `context` keys, plus
+        `cached` telling whether it was served from the answer cache.
     """
-    return run_qa_flow(question)
+    cache = get_answer_cache()
+    variant = cache_variant(retrieval_mode, planning_mode)
+    if cache is not None:
+        hit = await cache.lookup(question, variant)
+        if hit is not None:
+            result, _match = hit
+            return {**result, "cached": True}
+        # Answers computed against an older index must not be cached
+        generation = cache.generation
+
+    result = await run_qa_flow(
+        question,
+        retrieval_mode=retrieval_mode,
+        planning_mode=planning_mode,
+        timeout_seconds=timeout_seconds,
+    )
+
+    if cache is not None:
+        await cache.store(question, result, variant, generation)
+    return {**result, "cached": False}
+
+
+async def stream_answer(
+    question: str,
+    retrieval_mode: str | None = None,
+    planning_mode: str | None = None,
+    timeout_seconds: float | None = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Run the multi-agent QA flow, yielding per-stage events as they occur.
+
+    Args:
+        question: User's natural language question about the vector databases paper.
+        retrieval_mode: Optional override of the configured retrieval mode.
+        planning_mode: Optional override of the configured planning mode.
+        timeout_seconds: Optional request deadline (capped by `Settings`).
+
+    Yields:
+        `(event_name, data)` tuples; the last one is `("done", result)` where
+        `result` has the same shape as `answer_question`'s return value.
+        Cache hits skip straight to the `done` event.
+    """
+    cache = get_answer_cache()
+    variant = cache_variant(retrieval_mode, planning_mode)
+    if cache is not None:
+        hit = await cache.lookup(question, variant)
+        if hit is not None:
+            result, _match = hit
+            yield "done", {**result, "cached": True}
+            return
+        generation = cache.generation
+
+    async for event, data in stream_qa_flow(
+        question,
+        retrieval_mode=retrieval_mode,
+        planning_mode=planning_mode,
+        timeout_seconds=timeout_seconds,
+    ):
+        if event == "done":
+            if cache is not None:
+                await cache.store(question, data, variant, generation)
+            data = {**data, "cached": False}
+        yield event, data
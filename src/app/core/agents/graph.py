@@ -1,12 +1,25 @@
 """LangGraph orchestration for the linear multi-agent QA flow."""
 
+import time
 from functools import lru_cache
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Tuple
 
+from langchain_core.messages import AIMessageChunk
 from langgraph.constants import END, START
 from langgraph.graph import StateGraph
 
-from .agents import planning_node, retrieval_node, summarization_node, verification_node
+from ..config import get_settings
+from ..metrics import counter, increment, register_stats_provider
+from .agents import (
+    accept_draft_node,
+    not_found_node,
+    planning_node,
+    retrieval_node,
+    skip_planning_node,
+    summarization_node,
+    verification_node,
+)
+from .routing import is_simple_question
 from .state import QAState
 
 
@@ -14,10 +27,13 @@ def create_qa_graph() -> Any:
     """Create and compile the multi-agent QA graph with query planning.
 
     The graph executes in order:
-    1. Planning Agent: decomposes question into sub-questions
-    2. Retrieval Agent: gathers context for each sub-question
+    1. Planning Agent: decomposes question into sub-questions (simple
+       questions skip it and are retrieved as-is)
+    2. Retrieval Agent: gathers context for each sub-question; when no chunk
+       matches confidently the flow ends with a "not found" answer
     3. Summarization Agent: generates draft answer from context
-    4. Verification Agent: verifies and corrects the answer
+    4. Verification Agent: verifies and corrects the answer, unless the draft
+       passes the local groundedness check and is accepted as-is
 
     Returns:
         Compiled graph ready for execution.
@@ -26,56 +42,238 @@ def create_qa_graph() -> Any:
 
     # Add nodes for each agent
     builder.add_node("planning", planning_node)
+    builder.add_node("skip_planning", skip_planning_node)
     builder.add_node("retrieval", retrieval_node)
     builder.add_node("summarization", summarization_node)
     builder.add_node("verification", verification_node)
+    builder.add_node("accept_draft", accept_draft_node)
+    builder.add_node("not_found", not_found_node)
 
-    # Define linear flow: START -> planning -> retrieval -> summarization -> verification -> END
-    builder.add_edge(START, "planning")
+    # Define flow: START -> (planning | skip_planning) -> retrieval
+    #   -> (summarization -> (verification | accept_draft) | not_found) -> END
+    builder.add_conditional_edges(
+        START, route_from_start, ["planning", "skip_planning"]
+    )
     builder.add_edge("planning", "retrieval")
-    builder.add_edge("retrieval", "summarization")
-    builder.add_edge("summarization", "verification")
+    builder.add_edge("skip_planning", "retrieval")
+    builder.add_conditional_edges(
+        "retrieval", route_after_retrieval, ["summarization", "not_found"]
+    )
+    builder.add_conditional_edges(
+        "summarization",
+        route_after_summarization,
+        ["verification", "accept_draft", END],
+    )
     builder.add_edge("verification", END)
+    builder.add_edge("accept_draft", END)
+    builder.add_edge("not_found", END)
 
     return builder.compile()
 
 
+def route_from_start(state: QAState) -> str:
+    """Send simple questions past the Planning Agent (per `planning_mode`)."""
+    settings = get_settings()
+    mode = state.get("planning_mode") or settings.planning_mode
+    if mode == "never":
+        skip = True
+    elif mode == "always":
+        skip = False
+    else:
+        skip = is_simple_question(
+            state["question"], max_words=settings.planning_skip_max_words
+        )
+    increment("routing.skip_planning" if skip else "routing.planning")
+    return "skip_planning" if skip else "planning"
+
+
+def route_after_retrieval(state: QAState) -> str:
+    """End early when even the best retrieved chunk scores below the threshold.
+
+    Only complete retrievals short-circuit: an empty or weak result cut short
+    by the deadline says nothing about the document.
+    """
+    threshold = get_settings().not_found_score_threshold
+    if threshold is None or "retrieval_partial" in (state.get("degradations") or []):
+        return "summarization"
+    score = state.get("retrieval_score")
+    if score is None:
+        # Unscored chunks cannot be judged; no chunks at all means not found
+        found = bool(state.get("documents"))
+    else:
+        found = score >= threshold
+    increment("routing.answer" if found else "routing.not_found")
+    return "summarization" if found else "not_found"
+
+
+def _not_found_stats() -> Dict[str, Any]:
+    short_circuits = counter("routing.not_found")
+    routed = short_circuits + counter("routing.answer")
+    return {
+        "short_circuits": short_circuits,
+        "short_circuit_rate": short_circuits / routed if routed else 0.0,
+    }
+
+
+register_stats_provider("not_found_exit", _not_found_stats)
+
+
+def route_after_summarization(state: QAState) -> str:
+    """Skip verification when the draft is already well grounded in the context.
+
+    Partial results (no draft before the deadline) end the flow immediately.
+    """
+    if state.get("partial"):
+        return END
+    threshold = get_settings().verification_skip_threshold
+    groundedness = state.get("groundedness")
+    if threshold is not None and groundedness is not None and groundedness >= threshold:
+        return "accept_draft"
+    return "verification"
+
+
 @lru_cache(maxsize=1)
 def get_qa_graph() -> Any:
     """Get the compiled QA graph instance (singleton via LRU cache)."""
     return create_qa_graph()
 
 
-def run_qa_flow(question: str) -> Dict[str, Any]:
+async def run_qa_flow(
+    question: str,
+    retrieval_mode: str | None = None,
+    planning_mode: str | None = None,
+    timeout_seconds: float | None = None,
+) -> Dict[str, Any]:
     """Run the complete multi-agent QA flow for a question.
 
     This is the main entry point for the QA system. It:
     1. Initializes the graph state with the question
-    2. Executes the linear agent flow (Retrieval -> Summarization -> Verification)
+    2. Executes the linear agent flow asynchronously via `graph.ainvoke`
     3. Extracts and returns the final results
 
     Args:
         question: The user's question about the vector databases paper.
+        retrieval_mode: Optional per-request override of `Settings.retrieval_mode`
+            ("agentic" or "direct").
+        planning_mode: Optional per-request override of `Settings.planning_mode`
+            ("auto", "always" or "never").
+        timeout_seconds: Optional per-request deadline, capped by
+            `Settings.request_timeout_max_seconds`.
 
     Returns:
         Dictionary with keys:
-        - `answer`: Final verified answer
+        - `answer`: Final answer (verified, or the accepted draft)
+        - `verified`: Whether the Verification Agent ran
+        - `reason`: "answered", "not_found" or "deadline_exceeded"
         - `draft_answer`: Initial draft answer from summarization agent
         - `context`: Retrieved context from vector store
+        - `documents`: De-duplicated chunks the context was built from
         - `plan`: Generated search strategy
         - `sub_questions`: Decomposed search queries
+        - `retrieval_mode`: Retrieval mode used for this request
+        - `token_usage`: Per-request token accounting
+        - `degradations`: Degradations applied to meet the deadline
+        - `partial`: Whether no answer could be generated in time
     """
     graph = get_qa_graph()
 
-    initial_state: QAState = {
+    final_state = await graph.ainvoke(
+        _initial_state(question, retrieval_mode, planning_mode, timeout_seconds)
+    )
+
+    return final_state
+
+
+# Nodes whose LLM output is streamed to clients token by token
+_TOKEN_STREAM_NODES = ("summarization", "verification")
+
+
+async def stream_qa_flow(
+    question: str,
+    retrieval_mode: str | None = None,
+    planning_mode: str | None = None,
+    timeout_seconds: float | None = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Run the QA flow and yield progress events as they happen.
+
+    Events are yielded as `(event_name, data)` tuples, in order:
+    - `plan`: once planning finishes or is skipped (`plan` and `sub_questions`)
+    - `retrieval`: once per sub-question as its retrieval completes
+    - `token`: answer tokens from the summarization (draft) and
+      verification (final) agents, tagged with their `stage`
+    - `done`: the final state, i.e. the same result `run_qa_flow` returns
+
+    Args:
+        question: The user's question about the vector databases paper.
+        retrieval_mode: Optional per-request override of `Settings.retrieval_mode`.
+        planning_mode: Optional per-request override of `Settings.planning_mode`.
+        timeout_seconds: Optional per-request deadline.
+
+    Yields:
+        `(event_name, data)` tuples.
+    """
+    graph = get_qa_graph()
+    final_state: Dict[str, Any] = {}
+
+    # subgraphs=True is required to see tokens from the agents, which run as
+    # nested graphs inside our nodes.
+    async for namespace, mode, chunk in graph.astream(
+        _initial_state(question, retrieval_mode, planning_mode, timeout_seconds),
+        stream_mode=["updates", "messages", "custom", "values"],
+        subgraphs=True,
+    ):
+        node = namespace[0].split(":")[0] if namespace else None
+
+        if mode == "values" and not namespace:
+            final_state = chunk
+        elif mode == "updates" and not namespace:
+            planning_update = chunk.get("planning", chunk.get("skip_planning"))
+            if planning_update is not None:
+                update = planning_update or {}
+                yield "plan", {
+                    "plan": update.get("plan"),
+                    "sub_questions": update.get("sub_questions"),
+                }
+        elif mode == "custom" and not namespace:
+            yield chunk["event"], chunk["data"]
+        elif mode == "messages" and node in _TOKEN_STREAM_NODES:
+            message, _metadata = chunk
+            if isinstance(message, AIMessageChunk) and message.content:
+                yield "token", {"stage": node, "content": str(message.content)}
+
+    yield "done", final_state
+
+
+def _initial_state(
+    question: str,
+    retrieval_mode: str | None,
+    planning_mode: str | None,
+    timeout_seconds: float | None,
+) -> QAState:
+    """Build the initial graph state for a question."""
+    settings = get_settings()
+    timeout = timeout_seconds or settings.request_timeout_seconds
+    deadline = None
+    if timeout is not None:
+        deadline = time.monotonic() + min(timeout, settings.request_timeout_max_seconds)
+
+    return {
         "question": question,
+        "deadline": deadline,
+        "planning_mode": planning_mode or settings.planning_mode,
+        "retrieval_mode": retrieval_mode or settings.retrieval_mode,
         "plan": None,
         "sub_questions": None,
+        "speculative_documents": None,
+        "documents": None,
+        "retrieval_score": None,
         "context": None,
         "draft_answer": None,
+        "groundedness": None,
         "answer": None,
+        "verified": None,
+        "reason": None,
+        "token_usage": {},
+        "degradations": [],
+        "partial": False,
     }
-
-    final_state = graph.invoke(initial_state)
-
-    return final_state
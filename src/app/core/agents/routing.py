@@ -0,0 +1,59 @@
+"""Heuristic routing of questions around the Planning Agent.
+
+Single-intent questions gain little from query decomposition, so they can go
+straight to retrieval with the question itself as the only sub-question. The
+classifier is deliberately conservative: anything that looks like it combines
+several asks is sent to the planner.
+
+`query_similarity` decides whether a planner sub-question is close enough to
+the original question to reuse the results of speculative retrieval.
+"""
+
+import re
+
+from ..cache.keys import normalize_text
+
+_MULTI_INTENT_RE = re.compile(
+    r"\b(and|or|versus|vs\.?|compare[sd]?|comparison|difference|differences|"
+    r"between|as well as|respectively|pros|cons|advantages|disadvantages)\b"
+    r"|[;:]",
+    re.IGNORECASE,
+)
+
+
+def is_simple_question(question: str, max_words: int = 20) -> bool:
+    """Return True when `question` looks like a single-intent question.
+
+    A question is simple when it is short (at most `max_words` words), asks at
+    most one question (one "?") and contains no conjunctions, comparisons or
+    clause separators that suggest several sub-questions.
+
+    Args:
+        question: The user's question.
+        max_words: Maximum number of words for a simple question.
+
+    Returns:
+        Whether the Planning Agent can be skipped.
+    """
+    words = question.split()
+    if not words or len(words) > max_words:
+        return False
+    if question.count("?") > 1:
+        return False
+    if question.count(",") > 1:
+        return False
+    return _MULTI_INTENT_RE.search(question) is None
+
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def query_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the word sets of two queries (1.0 if identical)."""
+    if normalize_text(a) == normalize_text(b):
+        return 1.0
+    words_a = set(_WORD_RE.findall(a.lower()))
+    words_b = set(_WORD_RE.findall(b.lower()))
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
@@ -0,0 +1,201 @@
+"""Answer cache placed in front of the multi-agent QA flow.
+
+Lookups first try the normalized question text, then fall back to an
+embedding-similarity search over cached questions so paraphrases of a
+previously answered question can be served without running the agents.
+Entries are scoped to the pipeline variant (retrieval and planning mode) that
+produced them, so a request only ever gets answers of its own variant.
+Results degraded by the request deadline are never cached. Entries are tied
+to the vector index generation and dropped as soon as new content is indexed.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..config import get_settings
+from ..metrics import register_stats_provider
+from ..retrieval.vector_store import aembed_query, get_index_generation
+from .keys import normalize_text
+from .lru import LRUCache
+
+
+@dataclass
+class _Entry:
+    result: Dict[str, Any]
+    variant: str
+    embedding: np.ndarray | None = None
+
+
+class AnswerCache:
+    """Exact + semantic cache of QA results with LRU/TTL eviction."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float | None,
+        similarity_threshold: float | None,
+    ) -> None:
+        self._entries: LRUCache[str, _Entry] = LRUCache(max_entries, ttl_seconds)
+        self.similarity_threshold = similarity_threshold
+        self._generation = get_index_generation()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_generation(self) -> int:
+        """Drop every entry if documents were indexed since they were cached.
+
+        Returns:
+            The current index generation.
+        """
+        generation = get_index_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+                self.invalidations += 1
+        return generation
+
+    @property
+    def generation(self) -> int:
+        """Current index generation; pass it to `store` with the computed answer."""
+        return self._check_generation()
+
+    @staticmethod
+    def _normalized_vector(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def _embed(self, question: str) -> np.ndarray:
+        return self._normalized_vector(await aembed_query(question))
+
+    @staticmethod
+    def _key(question: str, variant: str) -> str:
+        return f"{variant}|{normalize_text(question)}"
+
+    async def lookup(
+        self, question: str, variant: str = ""
+    ) -> tuple[Dict[str, Any], str] | None:
+        """Return `(result, match_type)` for a cached answer, or None.
+
+        Args:
+            question: The user's question.
+            variant: Pipeline variant the answer must come from (see
+                `cache_variant`).
+
+        Returns:
+            The cached result and its `match_type` ("exact" or "semantic"),
+            or None on a miss.
+        """
+        self._check_generation()
+
+        entry = self._entries.get(self._key(question, variant))
+        if entry is not None:
+            self.exact_hits += 1
+            return dict(entry.result), "exact"
+
+        candidates = [
+            (k, e)
+            for k, e in self._entries.items()
+            if e.embedding is not None and e.variant == variant
+        ]
+        if self.similarity_threshold is not None and candidates:
+            query = await self._embed(question)
+            matrix = np.stack([e.embedding for _, e in candidates])
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity_threshold:
+                # get() refreshes the entry's LRU position
+                entry = self._entries.get(candidates[best][0])
+                if entry is not None:
+                    self.semantic_hits += 1
+                    return dict(entry.result), "semantic"
+
+        self.misses += 1
+        return None
+
+    async def store(
+        self,
+        question: str,
+        result: Dict[str, Any],
+        variant: str = "",
+        generation: int | None = None,
+    ) -> None:
+        """Cache the QA `result` for `question` under `variant`.
+
+        Results marked `partial` or carrying `degradations` are not cached.
+
+        Args:
+            question: The user's question.
+            result: The QA result to cache.
+            variant: Pipeline variant that produced `result`.
+            generation: Index generation `result` was computed against (from
+                `generation` at lookup time); the result is dropped if documents
+                were indexed since.
+        """
+        if result.get("partial") or result.get("degradations"):
+            return
+        current = self._check_generation()
+        if generation is not None and generation != current:
+            return
+        embedding = None
+        if self.similarity_threshold is not None:
+            embedding = await self._embed(question)
+            # Documents may have been indexed while embedding the question
+            if generation is not None and get_index_generation() != generation:
+                return
+        self._entries.set(
+            self._key(question, variant), _Entry(dict(result), variant, embedding)
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "size": len(self._entries),
+            "max_entries": self._entries.max_entries,
+            "hits": hits,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": self._entries.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def cache_variant(retrieval_mode: str | None, planning_mode: str | None) -> str:
+    """Identify the pipeline variant a request runs (per-request overrides first)."""
+    settings = get_settings()
+    return (
+        f"{retrieval_mode or settings.retrieval_mode}:"
+        f"{planning_mode or settings.planning_mode}"
+    )
+
+
+_answer_cache: AnswerCache | None = None
+
+
+def get_answer_cache() -> AnswerCache | None:
+    """Get the process-wide answer cache, or None when it is disabled."""
+    global _answer_cache
+    settings = get_settings()
+    if not settings.answer_cache_enabled:
+        return None
+    if _answer_cache is None:
+        _answer_cache = AnswerCache(
+            max_entries=settings.answer_cache_max_entries,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+            similarity_threshold=settings.answer_cache_similarity_threshold,
+        )
+        register_stats_provider("answer_cache", _answer_cache.stats)
+    return _answer_cache
@@ -0,0 +1,204 @@
+"""Cache of query embeddings in front of the vector store's embeddings model.
+
+Planner sub-questions and popular questions repeat constantly, so query
+vectors are kept in an in-memory LRU with an optional persistent SQLite tier.
+Keys are namespaced by embedding model name and output dimension: the same
+text embedded for a differently sized index must not be reused.
+"""
+
+import asyncio
+import hashlib
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from ..config import get_settings
+from ..metrics import register_stats_provider
+from .lru import LRUCache
+from .sqlite_store import SQLiteKVStore
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """`Embeddings` wrapper caching `embed_query` results.
+
+    Document embeddings (used when indexing) are passed straight through.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        namespace: str,
+        max_entries: int,
+        persistent_store: SQLiteKVStore | None = None,
+    ) -> None:
+        self.inner = inner
+        self.namespace = namespace
+        self._memory: LRUCache[str, List[float]] = LRUCache(max_entries)
+        self._persistent = persistent_store
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.miss_latency_total = 0.0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> List[float] | None:
+        vector = self._memory.get(key)
+        if vector is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return vector
+        if self._persistent is not None:
+            raw = self._persistent.get(key)
+            if raw is not None:
+                vector = np.frombuffer(raw, dtype=np.float32).tolist()
+                self._memory.set(key, vector)
+                with self._lock:
+                    self.persistent_hits += 1
+                return vector
+        return None
+
+    def _store(self, key: str, vector: List[float], latency: float) -> None:
+        with self._lock:
+            self.misses += 1
+            self.miss_latency_total += latency
+        self._memory.set(key, vector)
+        if self._persistent is not None:
+            self._persistent.set(key, np.asarray(vector, dtype=np.float32).tobytes())
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.inner.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            started = time.perf_counter()
+            vector = self.inner.embed_query(text)
+            self._store(key, vector, time.perf_counter() - started)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        if self._persistent is None:
+            vector = self._lookup(key)
+        else:
+            vector = await asyncio.to_thread(self._lookup, key)
+        if vector is None:
+            started = time.perf_counter()
+            vector = await self.inner.aembed_query(text)
+            latency = time.perf_counter() - started
+            if self._persistent is None:
+                self._store(key, vector, latency)
+            else:
+                await asyncio.to_thread(self._store, key, vector, latency)
+        return vector
+
+    def _store_many(
+        self, keys: List[str], vectors: List[List[float]], latency: float
+    ) -> None:
+        for key, vector in zip(keys, vectors):
+            self._store(key, vector, latency)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries, batching every cache miss into one call."""
+        keys = [self._key(text) for text in texts]
+        vectors = [self._lookup(key) for key in keys]
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            started = time.perf_counter()
+            embedded = self.inner.embed_documents([texts[i] for i in misses])
+            latency = (time.perf_counter() - started) / len(misses)
+            self._store_many([keys[i] for i in misses], embedded, latency)
+            for i, vector in zip(misses, embedded):
+                vectors[i] = vector
+        return vectors
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Async counterpart of `embed_queries`."""
+        keys = [self._key(text) for text in texts]
+        if self._persistent is None:
+            vectors = [self._lookup(key) for key in keys]
+        else:
+            vectors = await asyncio.to_thread(lambda: [self._lookup(k) for k in keys])
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            started = time.perf_counter()
+            embedded = await self.inner.aembed_documents([texts[i] for i in misses])
+            latency = (time.perf_counter() - started) / len(misses)
+            miss_keys = [keys[i] for i in misses]
+            if self._persistent is None:
+                self._store_many(miss_keys, embedded, latency)
+            else:
+                await asyncio.to_thread(self._store_many, miss_keys, embedded, latency)
+            for i, vector in zip(misses, embedded):
+                vectors[i] = vector
+        return vectors
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        avg_miss_latency = self.miss_latency_total / self.misses if self.misses else 0.0
+        return {
+            "namespace": self.namespace,
+            "size": len(self._memory),
+            "max_entries": self._memory.max_entries,
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "avg_miss_latency_ms": avg_miss_latency * 1000,
+            # Every hit avoided one embeddings round trip of average latency
+            "estimated_latency_saved_s": hits * avg_miss_latency,
+        }
+
+
+def cache_query_embeddings(
+    embeddings: Embeddings, model_name: str, dimensions: int | None
+) -> Embeddings:
+    """Wrap `embeddings` in a query cache according to `Settings`.
+
+    Args:
+        embeddings: The underlying embeddings model.
+        model_name: Embedding model name, part of the cache namespace.
+        dimensions: Embedding dimension, part of the cache namespace (None
+            for the model's native dimension).
+
+    Returns:
+        A `CachedQueryEmbeddings` wrapper, or `embeddings` unchanged when the
+        cache is disabled.
+    """
+    settings = get_settings()
+    if not settings.embedding_cache_enabled:
+        return embeddings
+
+    persistent_store = None
+    if settings.embedding_cache_persistent:
+        path = settings.embedding_cache_path or (
+            Path(tempfile.gettempdir()) / "embedding_cache.sqlite3"
+        )
+        persistent_store = SQLiteKVStore(
+            path,
+            table="query_embeddings",
+            max_entries=settings.embedding_cache_persistent_max_entries,
+        )
+
+    cached = CachedQueryEmbeddings(
+        embeddings,
+        namespace=f"{model_name}:{dimensions or 'native'}",
+        max_entries=settings.embedding_cache_max_entries,
+        persistent_store=persistent_store,
+    )
+    register_stats_provider("embedding_cache", cached.stats)
+    return cached
@@ -0,0 +1,14 @@
+"""Helpers for building cache keys."""
+
+import re
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for exact-match cache keys.
+
+    Lowercases, collapses whitespace and strips trailing punctuation so that
+    trivially different spellings of the same question share a key.
+    """
+    return _WHITESPACE_RE.sub(" ", text.strip().lower()).rstrip("?!. ")
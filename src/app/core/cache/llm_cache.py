@@ -0,0 +1,90 @@
+"""Persistent cache of chat-model responses.
+
+All agents run at `temperature=0.0`, so a response can be reused whenever the
+model configuration, system prompt and messages are identical. LangChain hands
+the cache the serialized messages as `prompt` and the model name/parameters as
+`llm_string`; their SHA-256 hash is the key into a shared SQLite store.
+"""
+
+import asyncio
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from ..config import get_settings
+from ..metrics import register_stats_provider
+from .sqlite_store import SQLiteKVStore
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain `BaseCache` backed by a bounded `SQLiteKVStore`."""
+
+    def __init__(self, store: SQLiteKVStore) -> None:
+        self.store = store
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        raw = self.store.get(self._key(prompt, llm_string))
+        if raw is None:
+            return None
+        return [loads(generation) for generation in json.loads(raw)]
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: Sequence[Any]
+    ) -> None:
+        payload = json.dumps([dumps(generation) for generation in return_val])
+        self.store.set(self._key(prompt, llm_string), payload.encode("utf-8"))
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+    # SQLite I/O is blocking, keep it off the event loop
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return await asyncio.to_thread(self.lookup, prompt, llm_string)
+
+    async def aupdate(
+        self, prompt: str, llm_string: str, return_val: Sequence[Any]
+    ) -> None:
+        await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        await asyncio.to_thread(self.clear)
+
+
+_llm_cache: SQLiteLLMCache | None = None
+
+
+def get_llm_cache(agent: str | None = None) -> SQLiteLLMCache | None:
+    """Get the shared LLM response cache if it is enabled for `agent`.
+
+    Args:
+        agent: Agent name ("planning", "retrieval", "summarization",
+            "verification"). Each has a `<agent>_llm_cache` flag in `Settings`.
+
+    Returns:
+        The process-wide cache instance, or None when caching is disabled.
+    """
+    global _llm_cache
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    if agent is not None and not getattr(settings, f"{agent}_llm_cache", True):
+        return None
+    if _llm_cache is None:
+        path = settings.llm_cache_path or (
+            Path(tempfile.gettempdir()) / "llm_cache.sqlite3"
+        )
+        store = SQLiteKVStore(
+            path, table="llm_responses", max_entries=settings.llm_cache_max_entries
+        )
+        _llm_cache = SQLiteLLMCache(store)
+        register_stats_provider("llm_cache", store.stats)
+    return _llm_cache
@@ -4,8 +4,15 @@ This module uses Pydantic Settings to load and validate environment variables
 for OpenAI models, Pinecone settings, and other system parameters.
 """
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+RetrievalMode = Literal["agentic", "direct"]
+PlanningMode = Literal["auto", "always", "never"]
+VectorStoreBackend = Literal["pinecone", "local"]
+PineconeTransport = Literal["http", "grpc", "asyncio"]
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -15,12 +22,164 @@ class Settings(BaseSettings):
     openai_model_name: str = "gpt-4o-mini"
     openai_embedding_model_name: str = "text-embedding-3-large"
 
+    # Per-agent model overrides (None falls back to openai_model_name) and
+    # output caps, e.g. a smaller model for planning and verification
+    planning_model_name: str | None = None
+    retrieval_model_name: str | None = None
+    summarization_model_name: str | None = None
+    verification_model_name: str | None = None
+    planning_max_tokens: int | None = 300
+    retrieval_max_tokens: int | None = 300
+    summarization_max_tokens: int | None = None
+    verification_max_tokens: int | None = None
+
+    # Shared OpenAI HTTP connection pool
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry_seconds: float = 30.0
+    llm_timeout_seconds: float = 60.0
+    llm_connect_timeout_seconds: float = 5.0
+    llm_max_retries: int = 2
+
+    # OpenAI rate limits enforced client-side (None = unlimited). Interactive
+    # /qa calls are scheduled ahead of bulk /index-pdf embedding work.
+    chat_requests_per_minute: int | None = None
+    chat_tokens_per_minute: int | None = None
+    embedding_requests_per_minute: int | None = None
+    embedding_tokens_per_minute: int | None = None
+    # Completion tokens assumed for chat calls without a max_tokens cap
+    rate_limit_completion_tokens: int = 512
+
+    # Request Hedging Configuration (duplicate slow chat/vector calls)
+    hedging_enabled: bool = False
+    # Fixed hedge delay; None uses the observed `hedge_percentile` latency
+    hedge_delay_seconds: float | None = None
+    hedge_percentile: float = 0.9
+    hedge_min_samples: int = 20
+    # Maximum share of calls (per call type) that may be hedged
+    hedge_max_ratio: float = 0.1
+
     # Pinecone Configuration
     pinecone_api_key: str | None = None
     pinecone_index_name: str | None = None
+    # Index host and dimension; when both are set no describe_index call is made
+    pinecone_index_host: str | None = None
+    pinecone_index_dimension: int | None = None
+    # "http" (pooled REST), "grpc" (needs pinecone[grpc]) or "asyncio" (aiohttp)
+    pinecone_transport: PineconeTransport = "http"
+    # Threads for parallel upserts and size of the keep-alive connection pool
+    pinecone_pool_threads: int = 8
+    pinecone_connection_pool_maxsize: int = 32
+
+    # Vector Store Backend
+    # "local" keeps embeddings in an in-process NumPy matrix instead of Pinecone
+    vector_store_backend: VectorStoreBackend = "pinecone"
+    # Directory the local store persists to (None keeps it in memory only)
+    local_store_path: str | None = None
+    # Storage precision of the local matrix; float16 halves memory and int8
+    # (memmap only) quarters it, with per-vector scales
+    local_store_dtype: Literal["float32", "float16", "int8"] = "float32"
+    # Keep vectors on disk via numpy.memmap so workers share the page cache
+    local_store_memmap: bool = False
+    # Quantized scans rescore k * factor candidates at full precision
+    local_store_rescore_factor: int = 4
+    # Local approximate index: "flat" scans every row, "ivf" probes clusters
+    local_store_index: Literal["flat", "ivf"] = "flat"
+    # IVF lists (None = about sqrt(rows)) and lists probed per query
+    local_ivf_lists: int | None = None
+    local_ivf_probe: int = 8
+    # Stores smaller than this are scanned exactly even with "ivf"
+    local_ivf_min_rows: int = 10000
+    # Embedding dimensions for the local store (None uses the model default)
+    local_embedding_dimensions: int | None = None
+
+    # Request Deadline Configuration
+    # Default per-request deadline and the cap applied to client-supplied ones
+    request_timeout_seconds: float | None = 60.0
+    request_timeout_max_seconds: float = 120.0
+    # Shares of the remaining time planning and retrieval may use
+    deadline_planning_fraction: float = 0.25
+    deadline_retrieval_fraction: float = 0.4
+    # Verification is skipped when less time than this is left
+    deadline_min_verification_seconds: float = 3.0
+
+    # Planning Configuration
+    # "auto": skip the Planning Agent for questions the local classifier deems
+    # simple; "always"/"never": always or never run it.
+    planning_mode: PlanningMode = "auto"
+    planning_skip_max_words: int = 20
 
     # Retrieval Configuration
     retrieval_k: int = 4
+    # Score-aware adaptive k: over-fetch up to retrieval_max_k (None = k) and keep
+    # chunks scoring at least the floor and within the relative margin of the
+    # best score, but never fewer than retrieval_min_k. Off unless a floor or
+    # margin is set.
+    retrieval_min_k: int = 1
+    retrieval_max_k: int | None = None
+    retrieval_score_floor: float | None = None
+    retrieval_relative_margin: float | None = None
+    # Answer "not found in the document" right after retrieval, skipping
+    # summarization/verification, when the best similarity score across all
+    # sub-questions is below this (None disables the early exit)
+    not_found_score_threshold: float | None = None
+    # Maximum number of sub-questions retrieved concurrently per request
+    retrieval_max_concurrency: int = 3
+    # "agentic": a Retrieval Agent LLM decides how to call the retrieval tool.
+    # "direct": each planner sub-question is sent straight to the vector store.
+    retrieval_mode: RetrievalMode = "agentic"
+    # Retrieve the raw question while the Planning Agent runs; reuse the result
+    # for sub-questions at least this similar to the question, else merge it in
+    speculative_retrieval: bool = True
+    speculative_match_threshold: float = 0.8
+    # Cache of retrieval results per (normalized query, k), invalidated on indexing.
+    # Invalidation reaches every worker on the host (see index_generation_path);
+    # workers on other hosts only drop stale entries after the TTL.
+    retrieval_cache_enabled: bool = True
+    retrieval_cache_max_entries: int = 1024
+    retrieval_cache_ttl_seconds: float | None = 300.0
+    # File holding the index generation shared by this host's workers
+    # (None = "rag_index_generation" in the system temp directory)
+    index_generation_path: str | None = None
+    # Token budget for the context sent to summarization/verification (None = unlimited)
+    context_token_budget: int | None = 3000
+
+    # Adaptive Verification Configuration
+    # Skip the Verification Agent when the draft's groundedness score reaches
+    # this value (None always runs verification)
+    verification_skip_threshold: float | None = 0.9
+    # Lexical overlap a draft sentence needs to count as supported by the context
+    grounding_sentence_overlap: float = 0.6
+
+    # Answer Cache Configuration
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: int = 512
+    answer_cache_ttl_seconds: float | None = 3600.0
+    # Minimum cosine similarity for a paraphrase hit (None disables semantic lookup)
+    answer_cache_similarity_threshold: float | None = 0.95
+
+    # LLM Response Cache Configuration (opt-in, persisted in SQLite)
+    llm_cache_enabled: bool = False
+    llm_cache_path: str | None = None  # defaults to <tmp>/llm_cache.sqlite3
+    llm_cache_max_entries: int = 10_000
+    planning_llm_cache: bool = True
+    retrieval_llm_cache: bool = True
+    summarization_llm_cache: bool = True
+    verification_llm_cache: bool = True
+
+    # Query Embedding Cache Configuration
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_entries: int = 4096
+    embedding_cache_persistent: bool = False
+    embedding_cache_path: str | None = None  # defaults to <tmp>/embedding_cache.sqlite3
+    embedding_cache_persistent_max_entries: int = 100_000
+
+    # Query Embedding Micro-Batching Configuration
+    # Concurrent query embeddings wait up to the window (or until the batch is
+    # full) and are sent to OpenAI as one request
+    embedding_batching_enabled: bool = True
+    embedding_batch_window_ms: float = 5.0
+    embedding_batch_max_size: int = 64
 
     model_config = SettingsConfigDict(
         env_file=".env",
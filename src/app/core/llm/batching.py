@@ -0,0 +1,165 @@
+"""Cross-request micro-batching of query embeddings.
+
+Concurrent requests each embed one or a few short queries at about the same
+moment. `MicroBatchingEmbeddings` holds async embedding calls for a short
+window (or until the batch is full), sends them to the model as a single
+`aembed_documents` request, and hands every caller its own vectors. A batch
+is sent at the most urgent rate-limit priority among its callers.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from ..metrics import register_stats_provider
+from .rate_limit import Priority, current_priority, llm_priority
+
+
+class _Batch:
+    """Texts collected on one event loop, waiting to be sent together."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.texts: List[str] = []
+        # (future, offset into texts, count, enqueue time, priority) per caller
+        self.waiters: List[tuple[asyncio.Future, int, int, float, Priority]] = []
+        self.timer: asyncio.TimerHandle | None = None
+        self.flushed = False
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """`Embeddings` wrapper batching async calls across concurrent callers.
+
+    Sync calls and async calls of `max_batch_size` texts or more are passed
+    straight through.
+
+    Args:
+        inner: The underlying embeddings model.
+        window_seconds: How long the first text of a batch may wait for others.
+        max_batch_size: Batches are sent as soon as they hold this many texts.
+    """
+
+    def __init__(
+        self, inner: Embeddings, window_seconds: float, max_batch_size: int
+    ) -> None:
+        self.inner = inner
+        self.window_seconds = window_seconds
+        self.max_batch_size = max(1, max_batch_size)
+        self._batch: _Batch | None = None
+        # Keeps in-flight send tasks referenced until they finish
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.callers = 0
+        self.queue_delay_total = 0.0
+        self.max_queue_delay = 0.0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.inner.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        if len(texts) >= self.max_batch_size:
+            return await self.inner.aembed_documents(texts)
+        return await self._enqueue(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        (vector,) = await self._enqueue([text])
+        return vector
+
+    async def _enqueue(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        batch = self._batch
+        if batch is not None and batch.loop is loop:
+            if len(batch.texts) + len(texts) > self.max_batch_size:
+                self._flush(batch)
+                batch = None
+        else:
+            # No open batch, or one left over from a different event loop
+            batch = None
+        if batch is None:
+            batch = self._batch = _Batch(loop)
+            batch.timer = loop.call_later(self.window_seconds, self._flush, batch)
+
+        future = loop.create_future()
+        enqueued = time.perf_counter()
+        batch.waiters.append(
+            (future, len(batch.texts), len(texts), enqueued, current_priority())
+        )
+        batch.texts.extend(texts)
+        if len(batch.texts) >= self.max_batch_size:
+            self._flush(batch)
+        return await future
+
+    def _flush(self, batch: _Batch) -> None:
+        if batch.flushed:
+            return
+        batch.flushed = True
+        batch.timer.cancel()
+        if self._batch is batch:
+            self._batch = None
+        task = batch.loop.create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: _Batch) -> None:
+        sent = time.perf_counter()
+        delays = [sent - waiter[3] for waiter in batch.waiters]
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch.texts)
+            self.callers += len(batch.waiters)
+            self.queue_delay_total += sum(delays)
+            self.max_queue_delay = max(self.max_queue_delay, *delays)
+
+        # The send task inherited the context (and rate-limit priority) of the
+        # caller that flushed; use the most urgent priority among the waiters
+        priority = min(waiter[4] for waiter in batch.waiters)
+        try:
+            with llm_priority(priority):
+                vectors = await self.inner.aembed_documents(batch.texts)
+        except Exception as exc:
+            for future, *_rest in batch.waiters:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for future, offset, count, *_rest in batch.waiters:
+            if not future.done():
+                future.set_result(vectors[offset : offset + count])
+
+    def stats(self) -> Dict[str, Any]:
+        batches, callers = self.batches, self.callers
+        return {
+            "window_ms": self.window_seconds * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "items": self.items,
+            "callers": callers,
+            "avg_batch_size": self.items / batches if batches else 0.0,
+            # Share of max_batch_size an average batch used
+            "avg_fill_rate": (
+                self.items / (batches * self.max_batch_size) if batches else 0.0
+            ),
+            # Time callers waited for their batch to be sent
+            "avg_queue_delay_ms": (
+                self.queue_delay_total / callers * 1000 if callers else 0.0
+            ),
+            "max_queue_delay_ms": self.max_queue_delay * 1000,
+        }
+
+
+def batch_embeddings(
+    embeddings: Embeddings, window_seconds: float, max_batch_size: int
+) -> MicroBatchingEmbeddings:
+    """Wrap `embeddings` in a micro-batcher and register its stats."""
+    batcher = MicroBatchingEmbeddings(embeddings, window_seconds, max_batch_size)
+    register_stats_provider("embedding_batching", batcher.stats)
+    return batcher
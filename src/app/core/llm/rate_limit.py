@@ -0,0 +1,266 @@
+"""Process-wide OpenAI rate-limit scheduler.
+
+Every chat and embedding request first acquires capacity from a pair of token
+buckets sized from the configured requests-per-minute (RPM) and
+tokens-per-minute (TPM) limits, instead of being sent immediately and retried
+after a 429. Waiting calls are queued by priority, then first-come first-served,
+so interactive `/qa` traffic overtakes bulk `/index-pdf` embedding work.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Dict, Iterator, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from ..config import get_settings
+from ..metrics import register_stats_provider
+from .tokens import count_tokens
+
+
+class Priority(IntEnum):
+    """Scheduling priority; lower values are served first."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+_current_priority: ContextVar[Priority] = ContextVar(
+    "llm_priority", default=Priority.INTERACTIVE
+)
+
+
+def current_priority() -> Priority:
+    """Priority OpenAI calls made in the current context run at."""
+    return _current_priority.get()
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Run the enclosed OpenAI calls at `priority`."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class _TokenBucket:
+    """Continuously refilling bucket holding at most one minute of budget."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        return max(0.0, (amount - self.level) / self.rate)
+
+
+# How often queued callers re-check whether it is their turn
+_POLL_INTERVAL = 0.05
+
+
+class RateLimitScheduler:
+    """Token-bucket scheduler with a priority queue of waiting calls.
+
+    Safe to use from the event loop (`acquire`) and from worker threads
+    (`acquire_sync`) at the same time.
+    """
+
+    def __init__(
+        self, requests_per_minute: int | None, tokens_per_minute: int | None
+    ) -> None:
+        self._requests = (
+            _TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self._tokens = _TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._acquired = {p: 0 for p in Priority}
+        self._waited = {p: 0.0 for p in Priority}
+
+    def _try_acquire(
+        self, ticket: Tuple[int, int], requests: int, tokens: int
+    ) -> float:
+        """Take capacity if `ticket` is first in line; else return a wait time."""
+        with self._lock:
+            if self._queue[0] != ticket:
+                return _POLL_INTERVAL
+            now = time.monotonic()
+            wait = 0.0
+            for bucket, amount in ((self._requests, requests), (self._tokens, tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    # A single call larger than the bucket waits for a full
+                    # bucket and then overdraws it; later calls repay the debt
+                    wait = max(wait, bucket.wait_time(min(amount, bucket.capacity)))
+            if wait > 0:
+                return wait
+            for bucket, amount in ((self._requests, requests), (self._tokens, tokens)):
+                if bucket is not None:
+                    bucket.level -= amount
+            heapq.heappop(self._queue)
+            return 0.0
+
+    def _enqueue(self, priority: Priority) -> Tuple[int, int]:
+        ticket = (int(priority), next(self._sequence))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _finish(
+        self, ticket: Tuple[int, int], priority: Priority, waited: float
+    ) -> None:
+        with self._lock:
+            if ticket in self._queue:  # cancelled while waiting
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                return
+            self._acquired[priority] += 1
+            self._waited[priority] += waited
+
+    async def acquire(self, tokens: int, requests: int = 1) -> None:
+        """Wait (without blocking the event loop) until the call may be sent."""
+        priority = current_priority()
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        try:
+            while (wait := self._try_acquire(ticket, requests, tokens)) > 0:
+                await asyncio.sleep(min(wait, _POLL_INTERVAL))
+        finally:
+            self._finish(ticket, priority, time.monotonic() - started)
+
+    def acquire_sync(self, tokens: int, requests: int = 1) -> None:
+        """Blocking variant of `acquire` for calls made from worker threads."""
+        priority = current_priority()
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        try:
+            while (wait := self._try_acquire(ticket, requests, tokens)) > 0:
+                time.sleep(min(wait, _POLL_INTERVAL))
+        finally:
+            self._finish(ticket, priority, time.monotonic() - started)
+
+    @property
+    def max_tokens_per_call(self) -> int | None:
+        """Largest token count one call can acquire without overdrawing."""
+        return int(self._tokens.capacity) if self._tokens is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": len(self._queue),
+                "requests_available": self._requests.level if self._requests else None,
+                "tokens_available": self._tokens.level if self._tokens else None,
+                **{
+                    priority.name.lower(): {
+                        "acquired": self._acquired[priority],
+                        "avg_wait_ms": (
+                            self._waited[priority] / self._acquired[priority] * 1000
+                            if self._acquired[priority]
+                            else 0.0
+                        ),
+                    }
+                    for priority in Priority
+                },
+            }
+
+
+_schedulers: Dict[str, RateLimitScheduler | None] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_rate_limiter(kind: str) -> RateLimitScheduler | None:
+    """Get the scheduler for `kind` ("chat" or "embedding").
+
+    Limits come from `<kind>_requests_per_minute` / `<kind>_tokens_per_minute`
+    in `Settings`; returns None when neither is set.
+    """
+    with _schedulers_lock:
+        if kind not in _schedulers:
+            settings = get_settings()
+            rpm = getattr(settings, f"{kind}_requests_per_minute")
+            tpm = getattr(settings, f"{kind}_tokens_per_minute")
+            scheduler = RateLimitScheduler(rpm, tpm) if (rpm or tpm) else None
+            if scheduler is not None:
+                register_stats_provider(f"{kind}_rate_limit", scheduler.stats)
+            _schedulers[kind] = scheduler
+        return _schedulers[kind]
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """`Embeddings` wrapper that acquires embedding rate-limit capacity first.
+
+    Document batches are split into API-call sized batches of at most
+    `batch_size` texts and at most the TPM bucket's capacity in tokens, and
+    capacity is acquired once per batch, right before it is sent.
+    """
+
+    def __init__(self, inner: Embeddings, model_name: str, batch_size: int) -> None:
+        self.inner = inner
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+    def _batches(
+        self, texts: List[str], max_tokens: int | None
+    ) -> Iterator[Tuple[List[str], int]]:
+        """Yield `(texts, tokens)` for each API call `texts` should be sent as."""
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = count_tokens(text, self.model_name)
+            if batch and (
+                len(batch) >= self.batch_size
+                or (max_tokens is not None and batch_tokens + tokens > max_tokens)
+            ):
+                yield batch, batch_tokens
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            yield batch, batch_tokens
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        scheduler = get_rate_limiter("embedding")
+        if scheduler is None:
+            return self.inner.embed_documents(texts)
+        vectors: List[List[float]] = []
+        for batch, tokens in self._batches(texts, scheduler.max_tokens_per_call):
+            scheduler.acquire_sync(tokens)
+            vectors.extend(self.inner.embed_documents(batch))
+        return vectors
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        scheduler = get_rate_limiter("embedding")
+        if scheduler is None:
+            return await self.inner.aembed_documents(texts)
+        vectors: List[List[float]] = []
+        for batch, tokens in self._batches(texts, scheduler.max_tokens_per_call):
+            await scheduler.acquire(tokens)
+            vectors.extend(await self.inner.aembed_documents(batch))
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        scheduler = get_rate_limiter("embedding")
+        if scheduler is not None:
+            scheduler.acquire_sync(count_tokens(text, self.model_name))
+        return self.inner.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        scheduler = get_rate_limiter("embedding")
+        if scheduler is not None:
+            await scheduler.acquire(count_tokens(text, self.model_name))
+        return await self.inner.aembed_query(text)
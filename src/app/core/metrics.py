@@ -0,0 +1,66 @@
+"""Process-wide performance metrics exposed through `/api/metrics`.
+
+Three kinds of metrics are collected:
+- Counters: monotonically increasing numbers updated with `increment`.
+- Latencies: durations recorded with `observe_latency`, reported as count and
+  average.
+- Stats providers: callables registered by components such as caches that
+  return a dictionary snapshot of their own statistics.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_latencies: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def increment(name: str, value: float = 1.0) -> None:
+    """Increase the counter `name` by `value`."""
+    with _lock:
+        _counters[name] += value
+
+
+def counter(name: str) -> float:
+    """Current value of the counter `name` (0.0 if never incremented)."""
+    with _lock:
+        return _counters.get(name, 0.0)
+
+
+def observe_latency(name: str, seconds: float) -> None:
+    """Record one observed duration for the operation `name`."""
+    with _lock:
+        entry = _latencies[name]
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def average_latency(name: str) -> float:
+    """Average observed duration of `name` in seconds (0.0 if never observed)."""
+    with _lock:
+        count, total = _latencies.get(name, (0, 0.0))
+    return total / count if count else 0.0
+
+
+def register_stats_provider(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Register (or replace) a callable reporting stats under `name`."""
+    with _lock:
+        _providers[name] = provider
+
+
+def get_metrics_snapshot() -> Dict[str, Any]:
+    """Return all counters and the current output of every stats provider."""
+    with _lock:
+        counters = dict(_counters)
+        latencies = {
+            name: {"count": count, "avg_ms": total / count * 1000 if count else 0.0}
+            for name, (count, total) in _latencies.items()
+        }
+        providers = dict(_providers)
+    snapshot: Dict[str, Any] = {"counters": counters, "latency": latencies}
+    for name, provider in providers.items():
+        snapshot[name] = provider()
+    return snapshot
@@ -0,0 +1,164 @@
+"""Utilities for building the LLM context from retrieved chunks."""
+
+import hashlib
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.documents import Document
+
+from ..llm.tokens import count_tokens, truncate_to_tokens
+
+
+def _chunk_key(doc: Document) -> str:
+    """Identify a chunk by its vector id, falling back to a content hash."""
+    if doc.id:
+        return f"id:{doc.id}"
+    content = doc.page_content.strip().encode("utf-8")
+    return f"sha1:{hashlib.sha1(content).hexdigest()}"
+
+
+def select_by_score(
+    docs: List[Document],
+    min_k: int,
+    max_k: int,
+    score_floor: float | None = None,
+    relative_margin: float | None = None,
+) -> List[Document]:
+    """Keep the confidently matching prefix of a score-ranked result list.
+
+    A chunk is kept when its `metadata["score"]` is at least `score_floor` and
+    at least `(1 - relative_margin)` times the top score. The result always
+    holds between `min_k` and `max_k` chunks (fewer only if fewer were found).
+
+    Args:
+        docs: Retrieved documents, best first, with scores in metadata.
+        min_k: Minimum number of chunks to keep regardless of score.
+        max_k: Maximum number of chunks to keep.
+        score_floor: Absolute minimum similarity score (None disables it).
+        relative_margin: Allowed fractional drop from the top score (None
+            disables it).
+
+    Returns:
+        The selected documents, in their original order.
+    """
+    if not docs:
+        return []
+    top_score = docs[0].metadata.get("score")
+    kept = 0
+    for doc in docs[:max_k]:
+        score = doc.metadata.get("score")
+        if score is None:
+            break
+        if score_floor is not None and score < score_floor:
+            break
+        if relative_margin is not None and top_score is not None and (
+            score < top_score - abs(top_score) * relative_margin
+        ):
+            break
+        kept += 1
+    return docs[: min(max(kept, min_k), max_k)]
+
+
+def deduplicate_chunks(doc_lists: List[List[Document]]) -> List[Document]:
+    """Merge per-sub-question retrieval results into one de-duplicated list.
+
+    A chunk retrieved for several sub-questions is kept once, with the best
+    (lowest) rank and the highest `metadata["score"]` it achieved in any
+    result list; the kept copy is the one from its best-scoring appearance.
+    The merged list is ordered by that best rank, then by first appearance,
+    and each chunk's rank is stored in `metadata["retrieval_rank"]`.
+
+    Args:
+        doc_lists: Retrieved documents for each sub-question, in rank order.
+
+    Returns:
+        De-duplicated documents, ready to be renumbered by `serialize_chunks`.
+    """
+    # key -> [best rank, first appearance, best score, document to keep]
+    best: Dict[str, List[Any]] = {}
+    for docs in doc_lists:
+        for rank, doc in enumerate(docs):
+            key = _chunk_key(doc)
+            score = doc.metadata.get("score")
+            entry = best.get(key)
+            if entry is None:
+                best[key] = [rank, len(best), score, doc]
+                continue
+            entry[0] = min(entry[0], rank)
+            if score is not None and (entry[2] is None or score > entry[2]):
+                entry[2] = score
+                entry[3] = doc
+
+    merged = []
+    for rank, _order, score, doc in sorted(best.values(), key=lambda item: item[:2]):
+        metadata = {**doc.metadata, "retrieval_rank": rank}
+        if score is not None:
+            metadata["score"] = score
+        merged.append(doc.model_copy(update={"metadata": metadata}))
+    return merged
+
+
+def _relevance_key(item: Tuple[int, Document]) -> Tuple[float, int, int]:
+    """Sort key: highest score first, then best retrieval rank, then input order."""
+    position, doc = item
+    score = doc.metadata.get("score")
+    return (
+        -score if score is not None else 0.0,
+        doc.metadata.get("retrieval_rank", position),
+        position,
+    )
+
+
+def pack_chunks(
+    docs: List[Document],
+    token_budget: int,
+    min_chunk_tokens: int = 50,
+    model_name: str | None = None,
+) -> List[Document]:
+    """Select the most relevant chunks that fit in `token_budget` tokens.
+
+    Chunks are ranked by `metadata["score"]` (when present), then by
+    `metadata["retrieval_rank"]`. They are added greedily in that order;
+    a chunk that does not fit is truncated if at least `min_chunk_tokens`
+    tokens of budget remain (and marked with `metadata["truncated"]`),
+    otherwise it is dropped. Token costs include the "Chunk N (page=X):"
+    header `serialize_chunks` adds.
+
+    Args:
+        docs: Candidate chunks.
+        token_budget: Maximum number of context tokens.
+        min_chunk_tokens: Smallest useful truncated chunk.
+        model_name: Model whose tokenizer to use (defaults to `openai_model_name`).
+
+    Returns:
+        The packed chunks, most relevant first.
+    """
+    packed: List[Document] = []
+    remaining = token_budget
+
+    for _position, doc in sorted(enumerate(docs), key=_relevance_key):
+        page_num = doc.metadata.get("page") or doc.metadata.get("page_number", "unknown")
+        # Header plus the blank line separating chunks
+        header = f"Chunk {len(packed) + 1} (page={page_num}):\n\n\n"
+        overhead = count_tokens(header, model_name)
+        content = doc.page_content.strip()
+        cost = overhead + count_tokens(content, model_name)
+
+        if cost <= remaining:
+            packed.append(doc)
+            remaining -= cost
+        elif remaining - overhead >= min_chunk_tokens:
+            truncated = truncate_to_tokens(content, remaining - overhead, model_name)
+            packed.append(
+                doc.model_copy(
+                    update={
+                        "page_content": truncated,
+                        "metadata": {**doc.metadata, "truncated": True},
+                    }
+                )
+            )
+            remaining = 0
+
+        if remaining <= 0:
+            break
+
+    return packed
@@ -0,0 +1,61 @@
+"""Index generation counter shared by the worker processes of one host.
+
+Caches tag their entries with the generation they were computed at and treat
+older entries as stale. The counter lives in a small file (not in process
+memory), so an upload handled by one uvicorn worker invalidates the caches of
+every worker on the host. Workers on other hosts do not see the file; their
+caches only expire through their TTLs.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class IndexGeneration:
+    """File-backed, monotonically increasing index generation.
+
+    Args:
+        path: File holding the counter; created on the first `bump`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def get(self) -> int:
+        """Return the current generation (0 before anything was indexed)."""
+        try:
+            return int(self.path.read_text(encoding="utf-8") or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.path.with_suffix(".lock"), "a+b") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def bump(self) -> int:
+        """Increment the generation and return the new value."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock():
+            generation = self.get() + 1
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(str(generation))
+            # Readers see either the old or the new value, never a partial write
+            os.replace(tmp, self.path)
+        return generation
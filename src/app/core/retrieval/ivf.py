@@ -0,0 +1,184 @@
+"""Inverted-file (IVF) approximate nearest-neighbour index.
+
+Rows are clustered with spherical k-means; each cluster ("list") holds the
+row numbers assigned to it. A query scores only the rows of its `n_probe`
+nearest lists instead of the whole matrix. New rows are assigned to their
+nearest centroid as they are inserted, and the centroids are retrained once
+the matrix outgrows the data they were trained on.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from .matrix import BLOCK_ROWS, temporary_path
+
+# Centroids are trained on at most this many sampled rows per list
+_SAMPLES_PER_LIST = 256
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def train_centroids(
+    vectors: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """Spherical k-means over a sample of `vectors`, returning unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_lists * _SAMPLES_PER_LIST)
+    rows = np.sort(rng.choice(len(vectors), sample_size, replace=False))
+    sample = np.asarray(vectors[rows], dtype=np.float32)
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        empty = np.bincount(assignments, minlength=n_lists) == 0
+        # Re-seed empty lists with random rows so no centroid goes unused
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+class IVFIndex:
+    """IVF index over the rows of a local embedding matrix.
+
+    Args:
+        n_lists: Number of lists; None picks about sqrt(rows) at training.
+        n_probe: Lists scanned per query (higher = better recall, slower).
+        min_rows: Below this many rows no index is built (exact scan).
+        retrain_factor: Retrain once rows exceed this multiple of the
+            training set size.
+    """
+
+    def __init__(
+        self,
+        n_lists: int | None = None,
+        n_probe: int = 8,
+        min_rows: int = 10_000,
+        retrain_factor: float = 4.0,
+    ) -> None:
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_rows = min_rows
+        self.retrain_factor = retrain_factor
+        self.centroids: np.ndarray | None = None
+        self.trained_rows = 0
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._lists: list[np.ndarray] = []
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), BLOCK_ROWS):
+            block = np.asarray(vectors[start : start + BLOCK_ROWS], dtype=np.float32)
+            assignments[start : start + len(block)] = np.argmax(
+                block @ self.centroids.T, axis=1
+            )
+        return assignments
+
+    def _build_lists(self) -> None:
+        order = np.argsort(self._assignments, kind="stable")
+        bounds = np.searchsorted(
+            self._assignments[order], np.arange(len(self.centroids) + 1)
+        )
+        self._lists = [order[bounds[i] : bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+    def train(self, vectors: np.ndarray) -> None:
+        """(Re)train centroids on `vectors` and assign every row."""
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        self.centroids = train_centroids(vectors, min(n_lists, len(vectors)))
+        self.trained_rows = len(vectors)
+        self._assignments = self._assign(vectors)
+        self._build_lists()
+
+    def add(self, vectors: np.ndarray, all_vectors: np.ndarray) -> None:
+        """Index rows appended to the matrix.
+
+        Args:
+            vectors: The newly appended rows.
+            all_vectors: The whole matrix including them, used when the
+                index is (re)trained.
+        """
+        total = len(all_vectors)
+        if total < self.min_rows:
+            return
+        if not self.trained or total > self.retrain_factor * self.trained_rows:
+            self.train(all_vectors)
+            return
+        first = len(self._assignments)
+        if first != total - len(vectors):
+            self.train(all_vectors)
+            return
+        assignments = self._assign(vectors)
+        self._assignments = np.concatenate([self._assignments, assignments])
+        new_rows = np.arange(first, total)
+        for list_id in np.unique(assignments):
+            added = new_rows[assignments == list_id]
+            self._lists[list_id] = np.concatenate([self._lists[list_id], added])
+
+    def select(self, keep: np.ndarray, all_vectors: np.ndarray) -> None:
+        """Follow a matrix compaction that kept only rows `keep`."""
+        if not self.trained:
+            return
+        if len(all_vectors) < self.min_rows:
+            self.reset()
+            return
+        self._assignments = self._assignments[keep]
+        self._build_lists()
+
+    def reset(self) -> None:
+        self.centroids = None
+        self.trained_rows = 0
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._lists = []
+
+    def probe(self, query: np.ndarray, n_probe: int | None = None) -> np.ndarray | None:
+        """Sorted candidate rows for `query`, or None when not trained."""
+        if not self.trained:
+            return None
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        nearest = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        # Sorted rows keep memory-mapped reads sequential
+        return np.sort(np.concatenate([self._lists[i] for i in nearest]))
+
+    # -- persistence -----------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        if not self.trained:
+            (path / "ivf.npz").unlink(missing_ok=True)
+            return
+        tmp = temporary_path(path, ".npz")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                assignments=self._assignments,
+                trained_rows=self.trained_rows,
+            )
+        tmp.replace(path / "ivf.npz")
+
+    def load(self, path: Path, all_vectors: np.ndarray) -> None:
+        """Restore a saved index, rebuilding it if it does not match the matrix."""
+        self.reset()
+        file = path / "ivf.npz"
+        if file.exists():
+            with np.load(file) as data:
+                centroids = data["centroids"]
+                assignments = data["assignments"]
+                trained_rows = int(data["trained_rows"])
+            configured = self.n_lists is None or self.n_lists == len(centroids)
+            if configured and len(assignments) == len(all_vectors):
+                self.centroids = centroids
+                self._assignments = assignments
+                self.trained_rows = trained_rows
+                self._build_lists()
+                return
+        if len(all_vectors) >= self.min_rows:
+            self.train(all_vectors)
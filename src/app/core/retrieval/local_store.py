@@ -0,0 +1,347 @@
+"""In-process vector store backed by a NumPy embedding matrix.
+
+An alternative to Pinecone for offline use and benchmarking: embeddings are
+L2-normalized and stored row-wise in one matrix, so a query is a single
+matrix-vector product followed by an `argpartition` top-k. The store
+persists to a directory (`vectors.npy` + `documents.jsonl`); with
+`memmap=True` the matrix stays on disk (see `matrix.QuantizedMatrix`) and
+quantized scores are rescored against full precision. An optional IVF index
+(`ivf.IVFIndex`) limits each query to a few clusters of rows.
+
+Several worker processes may share one store directory: writers hold an
+exclusive `flock` on `store.lock` for the whole reload, append and save
+sequence, and readers reload under a shared lock when another process has
+written. Without `fcntl` (Windows) only a single writing process is safe.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from .ivf import IVFIndex
+from .matrix import (
+    DenseMatrix,
+    MatrixDType,
+    QuantizedMatrix,
+    temporary_path,
+    top_k_indices,
+)
+
+
+# Parallel (ids, texts, metadatas) lists of the stored chunks
+_Documents = Tuple[List[str], List[str], List[dict]]
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LocalVectorStore(VectorStore):
+    """Cosine-similarity vector store held in process (or page-cache) memory.
+
+    Args:
+        embedding: Embeddings model used for documents and queries.
+        path: Directory to persist to; required when `memmap` is True.
+        dtype: Storage precision; int8 is only available with `memmap`.
+        memmap: Keep vectors on disk and open them with `numpy.memmap`.
+        rescore_factor: With quantized storage, `k * rescore_factor`
+            candidates are rescored against the float32 vectors.
+        ivf: Optional approximate index; None scans every row.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        path: str | Path | None = None,
+        dtype: MatrixDType = "float32",
+        memmap: bool = False,
+        rescore_factor: int = 4,
+        ivf: IVFIndex | None = None,
+    ) -> None:
+        self._embedding = embedding
+        self.path = Path(path) if path is not None else None
+        self.rescore_factor = max(1, rescore_factor)
+        if memmap:
+            if self.path is None:
+                raise ValueError("memmap storage requires a store path")
+            self._matrix = QuantizedMatrix(self.path, dtype)
+        else:
+            self._matrix = DenseMatrix(dtype)
+        self._ivf = ivf
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        # Last seen documents.jsonl mtime; another worker writing it triggers a reload
+        self._documents_mtime: int | None = None
+        self._refresh()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._matrix)
+
+    # -- persistence -----------------------------------------------------
+
+    def _documents_file(self) -> Path:
+        return self.path / "documents.jsonl"
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Hold the inter-process lock on the store directory."""
+        if self.path is None or fcntl is None:
+            yield
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / "store.lock", "a+b") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self, locked: bool = False) -> None:
+        """Load the store from disk if it changed since it was last read.
+
+        Args:
+            locked: The caller already holds the exclusive file lock; otherwise
+                a shared one is taken while reloading.
+        """
+        if self.path is None:
+            return
+        try:
+            mtime = self._documents_file().stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._documents_mtime:
+            return
+        if not locked:
+            with self._file_lock(exclusive=False):
+                self._load()
+            return
+        self._load()
+        if len(self._matrix) > len(self._ids):
+            # Rows of a write that crashed before documents.jsonl was saved
+            self._matrix.select(np.arange(len(self._ids), dtype=np.int64))
+            if self._ivf is not None:
+                self._ivf.load(self.path, self._matrix.vectors)
+
+    def _load(self) -> None:
+        mtime = self._documents_file().stat().st_mtime_ns
+        self._matrix.load(self.path)
+        if self._ivf is not None:
+            self._ivf.load(self.path, self._matrix.vectors)
+        ids, texts, metadatas = [], [], []
+        with open(self._documents_file(), encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                ids.append(record["id"])
+                texts.append(record["text"])
+                metadatas.append(record["metadata"])
+        self._ids, self._texts, self._metadatas = ids, texts, metadatas
+        self._documents_mtime = mtime
+
+    def save(self) -> None:
+        """Write the store to `path` (atomically replacing previous files)."""
+        if self.path is None:
+            return
+        with self._lock, self._file_lock(exclusive=True):
+            self._save()
+
+    def _save(self) -> None:
+        # Callers hold both the thread lock and the exclusive file lock
+        if self.path is None:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._matrix.save(self.path)
+        if self._ivf is not None:
+            self._ivf.save(self.path)
+        tmp = temporary_path(self.path, ".jsonl")
+        with open(tmp, "w", encoding="utf-8") as f:
+            rows = zip(self._ids, self._texts, self._metadatas)
+            for doc_id, text, metadata in rows:
+                record = {"id": doc_id, "text": text, "metadata": metadata}
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp, self._documents_file())
+        self._documents_mtime = self._documents_file().stat().st_mtime_ns
+
+    # -- writes ----------------------------------------------------------
+
+    def add_vectors(
+        self,
+        vectors: Sequence[Sequence[float]],
+        texts: Sequence[str],
+        metadatas: Sequence[dict] | None = None,
+        ids: Sequence[str] | None = None,
+    ) -> List[str]:
+        """Add pre-computed embeddings with their texts and metadata."""
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+        matrix = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh(locked=True)
+            self._matrix.append(matrix)
+            if self._ivf is not None:
+                self._ivf.add(matrix, self._matrix.vectors)
+            self._ids.extend(ids)
+            self._texts.extend(texts)
+            self._metadatas.extend(dict(m) for m in metadatas)
+            self._save()
+        return ids
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: List[dict] | None = None,
+        *,
+        ids: List[str] | None = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self._embedding.embed_documents(texts)
+        return self.add_vectors(vectors, texts, metadatas, ids)
+
+    def delete(self, ids: List[str] | None = None, **kwargs: Any) -> bool | None:
+        if not ids:
+            return False
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh(locked=True)
+            drop = set(ids)
+            keep = [i for i, doc_id in enumerate(self._ids) if doc_id not in drop]
+            keep_rows = np.asarray(keep, dtype=np.int64)
+            self._matrix.select(keep_rows)
+            if self._ivf is not None:
+                self._ivf.select(keep_rows, self._matrix.vectors)
+            self._ids = [self._ids[i] for i in keep]
+            self._texts = [self._texts[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._save()
+        return True
+
+    # -- reads -----------------------------------------------------------
+
+    @staticmethod
+    def _document(documents: _Documents, index: int) -> Document:
+        ids, texts, metadatas = documents
+        return Document(
+            id=ids[index],
+            page_content=texts[index],
+            metadata=dict(metadatas[index]),
+        )
+
+    def _top_k(
+        self,
+        matrix: DenseMatrix | QuantizedMatrix,
+        rows: np.ndarray | None,
+        query: np.ndarray,
+        k: int,
+    ) -> List[Tuple[int, float]]:
+        # `rows`: rows of the probed IVF lists, or None to scan the whole matrix
+        scores = matrix.scores(query, rows)
+        if not matrix.approximate:
+            best = top_k_indices(scores, k)
+            candidates = best if rows is None else rows[best]
+            return [(int(i), float(s)) for i, s in zip(candidates, scores[best])]
+        # Quantized scores pick candidates; full precision decides the order
+        best = top_k_indices(scores, k * self.rescore_factor)
+        candidates = best if rows is None else rows[best]
+        exact = matrix.exact_scores(candidates, query)
+        order = top_k_indices(exact, k)
+        return [(int(candidates[i]), float(exact[i])) for i in order]
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """Top-k by cosine similarity."""
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        with self._lock:
+            self._refresh()
+            if len(self._matrix) == 0:
+                return []
+            matrix = self._matrix.snapshot()
+            rows = self._ivf.probe(query) if self._ivf is not None else None
+            # Writers only append to these lists or replace them
+            documents = (self._ids, self._texts, self._metadatas)
+        # The scan runs outside the lock so concurrent queries run in parallel
+        return [
+            (self._document(documents, i), score)
+            for i, score in self._top_k(matrix, rows, query, k)
+        ]
+
+    async def asimilarity_search_by_vector_with_score(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return await asyncio.to_thread(
+            self.similarity_search_by_vector_with_score, embedding, k
+        )
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        results = self.similarity_search_by_vector_with_score(embedding, k)
+        return [doc for doc, _ in results]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(
+            self._embedding.embed_query(query), k
+        )
+
+    def similarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    async def asimilarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        embedding = await self._embedding.aembed_query(query)
+        return await self.asimilarity_search_by_vector_with_score(embedding, k)
+
+    async def asimilarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in await self.asimilarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # Cosine similarity in [-1, 1] mapped to a [0, 1] relevance score
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: List[dict] | None = None,
+        *,
+        ids: List[str] | None = None,
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from .core.agents.state import AnswerReason
+from .core.config import PlanningMode, RetrievalMode
 
 
 class QuestionRequest(BaseModel):
@@ -6,9 +9,16 @@ class QuestionRequest(BaseModel):
 
     The PRD specifies a single field named `question` that contains
     the user's natural language question about the vector databases paper.
+    `retrieval_mode` optionally overrides the configured retrieval mode
+    ("agentic" or "direct") and `planning_mode` the planning mode ("auto",
+    "always" or "never") for this request. `timeout_seconds` sets the request
+    deadline (capped by the server's maximum).
     """
 
     question: str
+    retrieval_mode: RetrievalMode | None = None
+    planning_mode: PlanningMode | None = None
+    timeout_seconds: float | None = Field(default=None, gt=0)
 
 
 class QAResponse(BaseModel):
@@ -16,9 +26,26 @@ class QAResponse(BaseModel):
 
     From the API consumer's perspective we only expose the final,
     verified answer plus the generated search plan and retrieved context.
+    `cached` is true when the answer was served from the answer cache,
+    `verified` tells whether the Verification Agent ran (it is skipped for
+    drafts that pass the local groundedness check) and
+    `token_usage` reports per-request token accounting (e.g. tokens saved by
+    de-duplicating chunks across sub-questions). When the request deadline
+    forced the pipeline to degrade, `degradations` lists what was cut short and
+    `partial` is true if no answer could be generated (only `context` is useful).
+    `reason` tells how the answer came about: "answered", "not_found" (nothing
+    in the document matched the question well enough to answer it) or
+    "deadline_exceeded".
     """
 
     answer: str
     context: str
     plan: str | None = None
     sub_questions: list[str] | None = None
+    retrieval_mode: RetrievalMode | None = None
+    cached: bool = False
+    verified: bool | None = None
+    token_usage: dict[str, int] | None = None
+    partial: bool = False
+    degradations: list[str] = Field(default_factory=list)
+    reason: AnswerReason = "answered"